@@ -17,14 +17,21 @@ sys.path.append(current_dir)
 from config.constants import DEFAULT_VALUES
 from styles.css import get_custom_css
 from utils.helpers import init_session_state
-from utils.performance import ComponentLoader, PerformanceMonitor
-
-# Import page modules (lazy loading will be applied)
-from pages.home_page import page_home
-from pages.learning_page import page_learning_modules
-from pages.analyzer_page import page_stock_analyzer
-from pages.whatif_page import page_what_if_calculator
-from pages.misc_pages import page_funds_explorer, page_achievements
+from utils.performance import (
+    CACHE_MANAGER, ComponentLoader, PerformanceMonitor, PageRegistry, estimate_nbytes
+)
+from utils.metrics import REGISTRY, start_metrics_exporters
+from utils.tracing import format_waterfall, span, trace
+
+# Page modules are imported on first navigation, not at startup
+PAGES = PageRegistry({
+    "🏠 Home": "pages.home_page:page_home",
+    "📚 Learning Modules": "pages.learning_page:page_learning_modules",
+    "🕵️ Stock Analyzer": "pages.analyzer_page:page_stock_analyzer",
+    "💸 'What If' Calculator": "pages.whatif_page:page_what_if_calculator",
+    "🧭 Funds Explorer": "pages.misc_pages:page_funds_explorer",
+    "🏅 Achievements": "pages.misc_pages:page_achievements"
+})
 
 
 def configure_app():
@@ -45,15 +52,8 @@ def setup_navigation():
     st.sidebar.title("Wall Street 101")
     st.sidebar.markdown("---")
 
-    # Page definitions
-    pages = {
-        "🏠 Home": page_home,
-        "📚 Learning Modules": page_learning_modules,
-        "🕵️ Stock Analyzer": page_stock_analyzer,
-        "💸 'What If' Calculator": page_what_if_calculator,
-        "🧭 Funds Explorer": page_funds_explorer,
-        "🏅 Achievements": page_achievements
-    }
+    # Page definitions (resolved lazily by the registry)
+    pages = PAGES
 
     # Custom navigation menu
     for page_name in pages.keys():
@@ -90,10 +90,68 @@ def add_sidebar_info():
             ComponentLoader.reset()
             st.sidebar.success("Cache cleared!")
 
+        _show_metrics_summary()
+        _show_memory_usage()
+
+
+def _show_metrics_summary():
+    """Shows latency percentiles and cache hit counts collected by this process."""
+    snapshot = REGISTRY.snapshot()
+    lines = []
+    for name, series in sorted(snapshot.items()):
+        lines.append(name)
+        for labels, entry in series:
+            label_text = ",".join(f"{v}" for v in labels.values()) or "-"
+            if 'p50' in entry:
+                lines.append(
+                    f"  {label_text}: n={entry['count']} p50={entry['p50'] * 1000:.0f}ms "
+                    f"p95={entry['p95'] * 1000:.0f}ms p99={entry['p99'] * 1000:.0f}ms"
+                )
+            else:
+                lines.append(f"  {label_text}: {entry['value']}")
+    with st.sidebar.expander("Metrics"):
+        st.text("\n".join(lines) or "No metrics recorded yet.")
+
+
+def _show_memory_usage():
+    """Shows cache memory against the global budget, by cache and by symbol."""
+    report = CACHE_MANAGER.usage_report()
+    mib = 1024 * 1024
+    lines = [
+        f"total   {report['total_bytes'] / mib:8.1f} / {report['budget_bytes'] / mib:.0f} MiB",
+        f"sessions{report['session_bytes'] / mib:8.2f} MiB ({report['sessions']} active)",
+        f"global evictions: {report['evictions']}",
+        "by cache:"
+    ]
+    for name, usage in report['caches'].items():
+        lines.append(f"  {name:<16}{usage['bytes'] / mib:8.2f} MiB  {usage['entries']} entries")
+    lines.append("by symbol:")
+    for tag, nbytes in list(report['by_tag'].items())[:15]:
+        lines.append(f"  {str(tag):<16}{nbytes / mib:8.2f} MiB")
+    with st.sidebar.expander("Memory"):
+        st.text("\n".join(lines))
+
+
+def _report_session_memory():
+    """Counts this session's state against the global cache budget."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        ctx = None
+    if ctx is None:
+        return
+    try:
+        state = {k: st.session_state[k] for k in st.session_state.keys()}
+        CACHE_MANAGER.report_session(ctx.session_id, estimate_nbytes(state))
+    except Exception:
+        pass  # best-effort accounting: never take down the page it runs after
+
 
 def load_page_with_performance_monitoring(page_func, page_name):
     """Load a page with performance monitoring."""
-    with PerformanceMonitor(f"Load {page_name}"):
+    with PerformanceMonitor(f"Load {page_name}", metric='page_render_seconds', page=page_name), \
+            span("page", page=page_name):
         try:
             page_func()
         except Exception as e:
@@ -105,22 +163,31 @@ def main():
     """Main application entry point."""
     # Configure the app
     configure_app()
+    start_metrics_exporters()
     
-    # Initialize session state
-    init_session_state()
-    
-    # Setup navigation and get pages
-    pages = setup_navigation()
-    
-    # Add sidebar information
-    add_sidebar_info()
-    
-    # Load and render the current page
-    current_page_name = st.session_state.page
-    current_page_func = pages[current_page_name]
-    
-    # Load page with performance monitoring
-    load_page_with_performance_monitoring(current_page_func, current_page_name)
+    with trace("rerun", page=st.session_state.get('page')) as rerun_trace:
+        # Initialize session state
+        with span("init_session_state"):
+            init_session_state()
+        
+        # Setup navigation and get pages
+        pages = setup_navigation()
+        
+        # Add sidebar information
+        add_sidebar_info()
+        
+        # Load and render the current page
+        current_page_name = st.session_state.page
+        with span("import_page", page=current_page_name):
+            current_page_func = pages[current_page_name]
+        
+        # Load page with performance monitoring
+        load_page_with_performance_monitoring(current_page_func, current_page_name)
+        _report_session_memory()
+
+    if st.session_state.get('debug_mode', False):
+        with st.sidebar.expander("Trace (this rerun)"):
+            st.code(format_waterfall(rerun_trace), language=None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+"""
+History cache admission benchmarks.
+
+Replays one access trace (symbol, period keys) against the history cache
+under plain LRU and under TinyLFU admission, with and without the curated
+symbols pinned, and reports hit rates overall and for curated symbols.
+The trace is either recorded from the app (WS101_ACCESS_TRACE=trace.jsonl)
+or synthesized: a Zipf-popular working set interleaved with classroom
+bursts of one-off tickers.
+
+Usage:
+    python -m benchmarks.admission --capacity 32 --output benchmarks/results/admission.json
+    python -m benchmarks.admission --trace trace.jsonl --cache stock_data
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "benchmarks", "results", "admission.json")
+
+# Popular symbols students look up beyond the curated ones
+POPULAR_SYMBOLS = (
+    "MSFT", "GOOGL", "META", "NFLX", "AMD", "INTC", "DIS", "KO", "PEP", "WMT",
+    "JPM", "BAC", "XOM", "CVX", "PFE", "MRNA", "ETH-USD", "DOGE-USD", "GME", "AMC"
+)
+
+
+def synthetic_trace(curated, n_accesses: int = 20_000, burst_every: int = 500, burst_size: int = 200,
+                    seed: int = 0) -> list:
+    """
+    Zipf-distributed lookups over curated + popular symbols, with a burst of
+    `burst_size` never-repeated tickers (a class typing random symbols)
+    every `burst_every` accesses.
+    """
+    rng = random.Random(seed)
+    working_set = sorted(curated) + list(POPULAR_SYMBOLS)
+    weights = [1.0 / (rank + 1) for rank in range(len(working_set))]
+    keys = []
+    one_off = 0
+    while len(keys) < n_accesses:
+        if keys and len(keys) % burst_every == 0:
+            for _ in range(burst_size):
+                keys.append((f"RND{one_off:05d}", "3y"))
+                one_off += 1
+        keys.append((rng.choices(working_set, weights)[0], "3y"))
+    return keys
+
+
+def replay(keys, capacity: int, policy: str, curated) -> dict:
+    """Runs the keys through a private LRUCache with the given policy."""
+    from utils.admission import TinyLFUAdmission
+    from utils.performance import CacheManager, LRUCache
+
+    admission = None
+    if policy != 'lru':
+        pinned = curated if policy == 'tinylfu_pinned' else ()
+        admission = TinyLFUAdmission(capacity, pinned=pinned, key_func=lambda key: key[0])
+    cache = LRUCache(f"replay_{policy}", max_entries=capacity, admission=admission,
+                     manager=CacheManager(max_bytes=sys.maxsize))
+
+    hits = curated_hits = curated_lookups = 0
+    for key in keys:
+        found, _ = cache.get(key)
+        hits += found
+        if key[0] in curated:
+            curated_lookups += 1
+            curated_hits += found
+        if not found:
+            cache.put(key, True, nbytes=1)
+    return {
+        'hit_rate': hits / len(keys) if keys else 0.0,
+        'curated_hit_rate': curated_hits / curated_lookups if curated_lookups else 0.0,
+        'rejections': cache.rejections,
+        'evictions': cache.evictions
+    }
+
+
+def run_benchmarks(keys, capacity: int, curated) -> dict:
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'accesses': len(keys),
+            'distinct_keys': len(set(keys)),
+            'capacity': capacity
+        },
+        'policies': {policy: replay(keys, capacity, policy, curated)
+                     for policy in ('lru', 'tinylfu', 'tinylfu_pinned')}
+    }
+
+
+def _print_summary(results):
+    meta = results['meta']
+    print(f"{meta['accesses']} accesses, {meta['distinct_keys']} distinct keys, capacity {meta['capacity']}")
+    print(f"{'policy':<16}{'hit rate':>10}{'curated':>10}{'rejected':>10}{'evicted':>10}")
+    for policy, stats in results['policies'].items():
+        print(
+            f"{policy:<16}{stats['hit_rate']:>10.1%}{stats['curated_hit_rate']:>10.1%}"
+            f"{stats['rejections']:>10}{stats['evictions']:>10}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trace", help="recorded JSONL access trace (default: synthetic)")
+    parser.add_argument("--cache", default="stock_data", help="cache name to replay from a recorded trace")
+    parser.add_argument("--capacity", type=int, default=32, help="cache entries")
+    parser.add_argument("--accesses", type=int, default=20_000, help="synthetic trace length")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    args = parser.parse_args(argv)
+
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    from utils.admission import load_access_trace
+    from utils.helpers import CURATED_SYMBOLS
+
+    if args.trace:
+        keys = load_access_trace(args.trace, args.cache)
+    else:
+        keys = synthetic_trace(CURATED_SYMBOLS, n_accesses=args.accesses)
+
+    results = run_benchmarks(keys, args.capacity, CURATED_SYMBOLS)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    _print_summary(results)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Headless per-page render benchmarks.
+
+Drives each page function through Streamlit's AppTest with deterministic
+synthetic OHLCV histories of several sizes, and reports wall time, emitted
+element count, Plotly payload bytes and Python allocations per render.
+
+Usage:
+    python -m benchmarks.pages --runs 3 --output benchmarks/results/pages.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.stubs import SYNTHETIC_END_DATE, install_stub_provider
+
+# Keep the trading-date index in memory: samples clear it, and must never
+# wipe the app's persisted index file
+os.environ["WS101_TRADING_INDEX"] = ""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "benchmarks", "results", "pages.json")
+
+# History lengths (trading days) fed to every provider call
+HISTORY_SIZES = {
+    'small': 60,
+    'medium': 756,
+    'huge': 10_000
+}
+
+# page function -> (module, interaction needed to render its charts)
+PAGES = {
+    'page_home': ('pages.home_page', None),
+    'page_learning_modules': ('pages.learning_page', None),
+    'page_stock_analyzer': ('pages.analyzer_page', "Analyze"),
+    'page_what_if_calculator': ('pages.whatif_page', "Calculate My Fortune!"),
+    'page_funds_explorer': ('pages.misc_pages', None),
+    'page_achievements': ('pages.misc_pages', None)
+}
+
+SCRIPT_TEMPLATE = """
+from utils.helpers import init_session_state
+from {module} import {func}
+
+init_session_state()
+{func}()
+"""
+
+
+def _count_elements(node):
+    """Counts leaf elements below an AppTest tree node."""
+    children = getattr(node, 'children', None)
+    if children is None:
+        return 1
+    return sum(_count_elements(child) for child in children.values())
+
+
+def _chart_payload_bytes(app):
+    """Total bytes of the Plotly specs the page sent to the browser."""
+    total = 0
+    for chart in app.get('plotly_chart'):
+        proto = chart.proto
+        spec = proto.spec if proto.spec else proto.figure.spec
+        total += len(spec.encode('utf-8'))
+    return total
+
+
+def render_page(func_name, n_bars):
+    """Renders one page from cold caches and returns its measurements."""
+    import pandas as pd
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from utils.performance import CACHE_MANAGER
+    from utils.prefetch import PREFETCHER
+    from utils.trading_index import TRADING_DATES
+
+    module, click_label = PAGES[func_name]
+    install_stub_provider(n_bars)
+    # Let the previous sample's prefetches land before emptying the caches they fill
+    PREFETCHER.wait_all()
+    st.cache_data.clear()
+    CACHE_MANAGER.clear()
+    TRADING_DATES.clear()
+
+    app = AppTest.from_string(SCRIPT_TEMPLATE.format(module=module, func=func_name), default_timeout=300)
+    # Invest on the first synthetic trading day so the date picker accepts it
+    first_day = pd.bdate_range(end=SYNTHETIC_END_DATE, periods=n_bars)[0].date()
+    app.session_state['what_if_start_date'] = first_day
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    app.run()
+    button = next((b for b in app.button if b.label == click_label), None)
+    if button is not None:
+        button.click()
+        app.run()
+    wall_ms = (time.perf_counter() - start) * 1000
+    current, peak = tracemalloc.get_traced_memory()
+    allocated_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+
+    return {
+        'wall_ms': wall_ms,
+        'elements': _count_elements(app._tree),
+        'chart_payload_bytes': _chart_payload_bytes(app),
+        'alloc_peak_kb': peak / 1024,
+        'alloc_live_blocks': allocated_blocks,
+        'exceptions': [str(e.value) for e in app.exception]
+    }
+
+
+def _summarize(samples, metric):
+    values = [s[metric] for s in samples]
+    return {'median': statistics.median(values), 'samples': values}
+
+
+def run_benchmarks(runs=3, pages=tuple(PAGES), sizes=tuple(HISTORY_SIZES)):
+    """Runs every page at every history size and returns the summary dict."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    # Warm-up pass so module imports are not charged to the first page
+    for func_name in pages:
+        render_page(func_name, HISTORY_SIZES['small'])
+
+    results = {}
+    for func_name in pages:
+        results[func_name] = {}
+        for size in sizes:
+            samples = [render_page(func_name, HISTORY_SIZES[size]) for _ in range(runs)]
+            results[func_name][size] = {
+                metric: _summarize(samples, metric)
+                for metric in ('wall_ms', 'elements', 'chart_payload_bytes', 'alloc_peak_kb', 'alloc_live_blocks')
+            }
+            results[func_name][size]['exceptions'] = sorted({e for s in samples for e in s['exceptions']})
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': runs,
+            'history_bars': {size: HISTORY_SIZES[size] for size in sizes}
+        },
+        'pages': results
+    }
+
+
+def _print_summary(results):
+    print(f"{'page':<26}{'size':<8}{'wall ms':>10}{'elements':>10}{'chart KB':>10}{'alloc KB':>10}")
+    for func_name, sizes in results['pages'].items():
+        for size, stats in sizes.items():
+            print(
+                f"{func_name:<26}{size:<8}"
+                f"{stats['wall_ms']['median']:>10.1f}"
+                f"{stats['elements']['median']:>10.0f}"
+                f"{stats['chart_payload_bytes']['median'] / 1024:>10.1f}"
+                f"{stats['alloc_peak_kb']['median']:>10.0f}"
+            )
+            for error in stats['exceptions']:
+                print(f"    ! {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="samples per page and size")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--page", action="append", choices=list(PAGES), help="page function(s) to render")
+    parser.add_argument("--size", action="append", choices=list(HISTORY_SIZES), help="history size(s)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.runs, args.page or tuple(PAGES), args.size or tuple(HISTORY_SIZES))
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    _print_summary(results)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
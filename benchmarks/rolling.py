@@ -0,0 +1,153 @@
+"""
+Rolling risk statistics benchmarks.
+
+Times utils.rolling.RollingStats (prefix-sum kernels) against the pandas
+rolling equivalents (std, mean / std, cov / var) for windows of 20-252
+trading days on synthetic symbol/benchmark closes: a full build, a tail
+update after one new bar, and optionally pandas' rolling().apply. Also
+reports the largest difference from pandas for each statistic.
+
+Usage:
+    python -m benchmarks.rolling --bars 10000 --output benchmarks/results/rolling.json
+    python -m benchmarks.rolling --apply   # include the (slow) rolling().apply baseline
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "benchmarks", "results", "rolling.json")
+
+WINDOWS = (20, 63, 126, 252)
+
+
+def synthetic_histories(n_bars: int, seed: int = 0):
+    """A benchmark random walk and a symbol with beta ~1.3 to it, as Close-only PriceHistory objects."""
+    import numpy as np
+    from utils.history import PriceHistory
+
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0004, 0.01, n_bars)
+    own = 1.3 * market + rng.normal(0.0, 0.012, n_bars)
+    days = np.arange(n_bars, dtype=np.int64) + 7_000
+    return (
+        PriceHistory('SYM', days, {'Close': 50 * np.cumprod(1 + own)}),
+        PriceHistory('SPY', days, {'Close': 100 * np.cumprod(1 + market)})
+    )
+
+
+def _timed(func, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def _pandas_rolling(r, m, window: int, periods_per_year: int):
+    roll = r.rolling(window)
+    std = roll.std()
+    return std * math.sqrt(periods_per_year), roll.mean() / std * math.sqrt(periods_per_year), \
+        roll.cov(m) / m.rolling(window).var()
+
+
+def bench_window(history, benchmark, window: int, runs: int, include_apply: bool) -> dict:
+    import numpy as np
+    import pandas as pd
+    from utils.history import PriceHistory
+    from utils.rolling import RollingStats
+
+    def full():
+        stats = RollingStats(window)
+        stats.update(history, benchmark)
+        return stats
+
+    def tail():
+        # Engine already holding all but the last bar; time only the update
+        stats = RollingStats(window)
+        stats.update(*(PriceHistory(h.symbol, h.days[:-1], {'Close': h['Close'][:-1]})
+                       for h in (history, benchmark)))
+        start = time.perf_counter()
+        stats.update(history, benchmark)
+        return (time.perf_counter() - start) * 1000
+
+    periods_per_year = RollingStats(window).periods_per_year
+    r = pd.Series(history['Close']).pct_change().iloc[1:].reset_index(drop=True)
+    m = pd.Series(benchmark['Close']).pct_change().iloc[1:].reset_index(drop=True)
+
+    full_ms, stats = _timed(full, runs)
+    tail_ms = statistics.median(tail() for _ in range(runs))
+    pandas_ms, (volatility, sharpe, beta) = _timed(lambda: _pandas_rolling(r, m, window, periods_per_year), runs)
+    result = {
+        'numpy_full_ms': full_ms,
+        'numpy_tail_update_ms': tail_ms,
+        'pandas_rolling_ms': pandas_ms,
+        'max_abs_diff': {
+            'volatility': float(np.nanmax(np.abs(volatility.to_numpy() - stats.volatility))),
+            'sharpe': float(np.nanmax(np.abs(sharpe.to_numpy() - stats.sharpe))),
+            'beta': float(np.nanmax(np.abs(beta.to_numpy() - stats.beta)))
+        }
+    }
+    if include_apply:
+        result['pandas_apply_ms'], _ = _timed(
+            lambda: r.rolling(window).apply(lambda x: x.std(ddof=1), raw=True), 1
+        )
+    return result
+
+
+def run_benchmarks(n_bars: int, runs: int, include_apply: bool) -> dict:
+    history, benchmark = synthetic_histories(n_bars)
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'bars': n_bars,
+            'runs': runs
+        },
+        'windows': {str(w): bench_window(history, benchmark, w, runs, include_apply) for w in WINDOWS}
+    }
+
+
+def _print_summary(results):
+    meta = results['meta']
+    print(f"{meta['bars']} bars, median of {meta['runs']} runs (ms)")
+    print(f"{'window':>8}{'numpy':>10}{'tail':>10}{'pandas':>10}{'apply':>10}{'max diff':>12}")
+    for window, stats in results['windows'].items():
+        apply_ms = stats.get('pandas_apply_ms')
+        print(
+            f"{window:>8}{stats['numpy_full_ms']:>10.2f}{stats['numpy_tail_update_ms']:>10.3f}"
+            f"{stats['pandas_rolling_ms']:>10.2f}{apply_ms if apply_ms is not None else float('nan'):>10.1f}"
+            f"{max(stats['max_abs_diff'].values()):>12.1e}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bars", type=int, default=10_000, help="synthetic history length")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per measurement (median)")
+    parser.add_argument("--apply", action="store_true", help="also time rolling().apply (slow)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    args = parser.parse_args(argv)
+
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    results = run_benchmarks(args.bars, args.runs, args.apply)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    _print_summary(results)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
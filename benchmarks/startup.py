@@ -0,0 +1,191 @@
+"""
+Import-time and cold-start benchmarks for app.py vs app_optimized.py.
+
+Every sample runs in a fresh interpreter with the data provider stubbed, so
+numbers reflect a real cold start without network noise. Medians over
+`--runs` samples are written to a JSON file.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --output benchmarks/results/startup.json
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PACKAGES = ['config', 'data', 'utils', 'pages', 'styles']
+ENTRY_POINTS = ['app.py', 'app_optimized.py']
+PAGE_NAMES = [
+    "🏠 Home",
+    "📚 Learning Modules",
+    "🕵️ Stock Analyzer",
+    "💸 'What If' Calculator",
+    "🧭 Funds Explorer",
+    "🏅 Achievements"
+]
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "benchmarks", "results", "startup.json")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# --- Workers (run inside a fresh interpreter) ---
+
+def _worker_imports():
+    """Times importing every module of each package, in dependency order."""
+    from benchmarks.stubs import install_stub_provider
+    install_stub_provider()
+
+    timings = {}
+    start = time.perf_counter()
+    import streamlit  # noqa: F401 - shared baseline for every package
+    timings['streamlit'] = (time.perf_counter() - start) * 1000
+
+    for package in PACKAGES:
+        start = time.perf_counter()
+        module = importlib.import_module(package)
+        for info in pkgutil.iter_modules(module.__path__):
+            importlib.import_module(f"{package}.{info.name}")
+        timings[package] = (time.perf_counter() - start) * 1000
+
+    return {'import_ms': timings, 'peak_rss_mb': peak_rss_mb()}
+
+
+def _worker_render(entry, page_name):
+    """Measures the first full render of one page through AppTest."""
+    from benchmarks.stubs import install_stub_provider
+    install_stub_provider()
+    from streamlit.testing.v1 import AppTest
+
+    rss_before = peak_rss_mb()
+    app = AppTest.from_file(os.path.join(REPO_ROOT, entry), default_timeout=120)
+    app.session_state['page'] = page_name
+
+    start = time.perf_counter()
+    app.run()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'first_render_ms': render_ms,
+        'peak_rss_mb': peak_rss_mb(),
+        'harness_rss_mb': rss_before,
+        'exceptions': [str(e.value) for e in app.exception]
+    }
+
+
+# --- Driver ---
+
+def _run_worker(*args):
+    """Runs one sample in a fresh interpreter and returns its JSON result."""
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--worker", *args],
+        cwd=REPO_ROOT, capture_output=True, text=True, encoding="utf-8"
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark worker {args} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _summarize(samples):
+    """Median plus raw samples for one metric."""
+    values = [s for s in samples if s is not None]
+    return {
+        'median': statistics.median(values) if values else None,
+        'min': min(values) if values else None,
+        'max': max(values) if values else None,
+        'samples': values
+    }
+
+
+def run_benchmarks(runs=5, entries=ENTRY_POINTS, pages=PAGE_NAMES):
+    """Collects import and render samples and returns the summary dict."""
+    import_samples = [_run_worker("imports") for _ in range(runs)]
+    imports = {
+        name: _summarize([s['import_ms'][name] for s in import_samples])
+        for name in ['streamlit'] + PACKAGES
+    }
+
+    renders = {}
+    for entry in entries:
+        renders[entry] = {}
+        for page_name in pages:
+            samples = [_run_worker("render", entry, page_name) for _ in range(runs)]
+            renders[entry][page_name] = {
+                'first_render_ms': _summarize([s['first_render_ms'] for s in samples]),
+                'peak_rss_mb': _summarize([s['peak_rss_mb'] for s in samples]),
+                'harness_rss_mb': _summarize([s['harness_rss_mb'] for s in samples]),
+                'exceptions': sorted({e for s in samples for e in s['exceptions']})
+            }
+
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': runs
+        },
+        'imports': imports,
+        'renders': renders
+    }
+
+
+def _print_summary(results):
+    print(f"Import time (median of {results['meta']['runs']} runs, ms)")
+    for name, stats in results['imports'].items():
+        print(f"  {name:<12}{stats['median']:>10.1f}")
+    for entry, pages in results['renders'].items():
+        print(f"\n{entry}: first render (ms) / peak RSS (MiB)")
+        for page_name, stats in pages.items():
+            rss = stats['peak_rss_mb']['median']
+            rss_text = f"{rss:.1f}" if rss is not None else "n/a"
+            print(f"  {page_name:<28}{stats['first_render_ms']['median']:>10.1f}{rss_text:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="samples per measurement")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--entry", action="append", choices=ENTRY_POINTS, help="entry point(s) to render")
+    parser.add_argument("--page", action="append", choices=PAGE_NAMES, help="page(s) to render")
+    parser.add_argument("--worker", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        kind, *params = args.worker
+        result = _worker_imports() if kind == "imports" else _worker_render(*params)
+        print(json.dumps(result))
+        return
+
+    results = run_benchmarks(args.runs, args.entry or ENTRY_POINTS, args.page or PAGE_NAMES)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    _print_summary(results)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Deterministic stand-ins for the market data provider used by the benchmarks.
+Installs an import hook so `yfinance` is still really imported (its import
+cost is part of what we measure) but never touches the network.
+"""
+
+import importlib.abc
+import importlib.util
+import sys
+import types
+import zlib
+
+# Fixed end date so every run sees exactly the same bars
+SYNTHETIC_END_DATE = "2024-06-28"
+
+# Approximate trading-day counts for the periods the app requests
+PERIOD_BARS = {
+    '1d': 1,
+    '2d': 2,
+    '5d': 5,
+    '1mo': 21,
+    '3mo': 63,
+    '6mo': 126,
+    '1y': 252,
+    '2y': 504,
+    '3y': 756,
+    '5y': 1260,
+    '10y': 2520,
+    'max': 7500
+}
+
+# Overrides the period-based length when set (see install_stub_provider)
+_bars_override = None
+
+
+def synthetic_history(symbol: str, n_bars: int, end: str = SYNTHETIC_END_DATE):
+    """Builds a reproducible OHLCV frame shaped like `Ticker.history()` output."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(zlib.crc32(symbol.upper().encode("utf-8")))
+    index = pd.bdate_range(end=end, periods=n_bars, tz="America/New_York", name="Date")
+
+    close = 50.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.018, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.006, n_bars))
+    spread = np.abs(rng.normal(0, 0.012, n_bars))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.integers(1_000_000, 80_000_000, n_bars).astype(np.int64)
+
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume,
+        'Dividends': 0.0,
+        'Stock Splits': 0.0
+    }, index=index)
+
+
+def _bars_for(period=None, start=None, end=None):
+    """Number of bars to return for a provider request."""
+    if _bars_override is not None:
+        return _bars_override
+    if start is not None:
+        import pandas as pd
+        stop = pd.Timestamp(end or SYNTHETIC_END_DATE)
+        return max(len(pd.bdate_range(start=start, end=stop)), 1)
+    return PERIOD_BARS.get(period, PERIOD_BARS['3y'])
+
+
+def _slice_dates(frame, start=None, end=None):
+    """Applies start/end bounds the way the provider does (end exclusive)."""
+    import pandas as pd
+
+    dates = frame.index.tz_localize(None)
+    if start is not None:
+        frame = frame[dates >= pd.Timestamp(start)]
+        dates = frame.index.tz_localize(None)
+    if end is not None:
+        frame = frame[dates < pd.Timestamp(end)]
+    return frame
+
+
+class StubFastInfo:
+    def __init__(self, last_price):
+        self.last_price = last_price
+
+
+class StubTicker:
+    """Offline replacement for `yfinance.Ticker`."""
+
+    def __init__(self, ticker, session=None, **kwargs):
+        self.ticker = ticker.upper()
+
+    def history(self, period="1mo", start=None, end=None, **kwargs):
+        frame = synthetic_history(self.ticker, _bars_for(period, start, end))
+        return _slice_dates(frame, start, end)
+
+    @property
+    def info(self):
+        close = synthetic_history(self.ticker, 2)['Close']
+        return {
+            'longName': f"{self.ticker} Synthetic Corp.",
+            'regularMarketPrice': float(close.iloc[-1]),
+            'previousClose': float(close.iloc[-2]),
+            'marketCap': 1_000_000_000,
+            'trailingPE': 21.5,
+            'sector': 'Technology',
+            'industry': 'Software',
+            'website': 'https://example.com',
+            'longBusinessSummary': 'Synthetic company used for benchmarking.'
+        }
+
+    @property
+    def fast_info(self):
+        return StubFastInfo(self.info['regularMarketPrice'])
+
+    @property
+    def news(self):
+        return []
+
+
+def stub_download(tickers, period=None, start=None, end=None, group_by="column", **kwargs):
+    """
+    Offline replacement for `yfinance.download`: single-level columns for one
+    symbol, (symbol, field) or (field, symbol) columns for a list of them.
+    """
+    symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+    frames = {}
+    for symbol in symbols:
+        frame = synthetic_history(symbol, _bars_for(period or "1mo", start, end))
+        frames[symbol] = _slice_dates(frame, start, end).drop(columns=['Dividends', 'Stock Splits'])
+    if isinstance(tickers, str):
+        return frames[tickers]
+    import pandas as pd
+    combined = pd.concat(frames, axis=1)
+    return combined if group_by == "ticker" else combined.swaplevel(0, 1, axis=1)
+
+
+def _patch_provider(module):
+    module.Ticker = StubTicker
+    module.download = stub_download
+
+
+class _ProviderStubFinder(importlib.abc.MetaPathFinder):
+    """Patches `yfinance` right after its real import completes."""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != "yfinance":
+            return None
+        sys.meta_path.remove(self)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            sys.meta_path.insert(0, self)
+        if spec is None:
+            return None
+
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            _patch_provider(module)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+def install_stub_provider(n_bars: int = None):
+    """
+    Route all provider calls to synthetic data.
+    `n_bars` fixes every history's length regardless of the requested period.
+    """
+    global _bars_override
+    _bars_override = n_bars
+
+    module = sys.modules.get("yfinance")
+    if module is not None:
+        _patch_provider(module)
+    elif importlib.util.find_spec("yfinance") is None:
+        # Provider not installed: a bare module is enough for the benchmarks
+        module = types.ModuleType("yfinance")
+        _patch_provider(module)
+        sys.modules["yfinance"] = module
+    elif not any(isinstance(f, _ProviderStubFinder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _ProviderStubFinder())
@@ -32,6 +32,13 @@ COLS_PER_ROW_SHIELDS = 3
 MAX_NEWS_ITEMS = 5
 DEFAULT_CHART_PERIOD = "3y"
 
+# Chart range buttons: label -> months shown (None = the whole history)
+CHART_RANGES = {'1M': 1, '3M': 3, '6M': 6, '1Y': 12, '5Y': 60, 'Max': None}
+DEFAULT_CHART_RANGE = "1Y"
+# Ranges up to this many months are cut from the DEFAULT_CHART_PERIOD history,
+# which leaves room for the 200-bar moving average warm-up; longer ones load max
+SHORT_CHART_RANGE_MONTHS = 12
+
 # Badge system constants
 BADGES_CONFIG = {
     'charts_viewed_threshold': 10,
@@ -58,4 +65,108 @@ DEFAULT_VALUES = {
     'what_if_symbol': 'NVDA',
     'what_if_amount': 1000,
     'analyzer_symbol': 'AAPL'
-}
\ No newline at end of file
+}
+
+# Performance metrics (see utils/metrics.py)
+METRICS_CONFIG = {
+    'namespace': 'wallstreet101',
+    'histogram_window': 1024,       # most recent samples kept per series for p50/p95/p99
+    'max_series_per_metric': 500,   # label combinations beyond this are folded into "_other"
+    'export_path': None,            # Prometheus text file, e.g. "metrics.prom" (env: WS101_METRICS_FILE)
+    'export_interval': 15,          # seconds between text-file exports
+    'http_port': None               # serve /metrics on this port (env: WS101_METRICS_PORT)
+}
+
+# Request tracing (see utils/tracing.py)
+TRACING_CONFIG = {
+    'slow_trace_ms': 1500,                 # traces slower than this are dumped
+    'slow_trace_path': 'slow_traces.jsonl',  # env: WS101_SLOW_TRACE_FILE ("" disables)
+    'max_spans_per_trace': 500,
+    'waterfall_width': 24                  # characters in the debug sidebar bars
+}
+
+# Global memory budget shared by all data caches (see utils/performance.py)
+CACHE_CONFIG = {
+    'global_max_bytes': 512 * 1024 * 1024,  # env: WS101_CACHE_BUDGET_MB
+    'eviction_sample': 8,        # oldest entries per cache considered for each global eviction
+    'session_ttl': 3600,         # forget a session's state size after this long without a rerun
+    'history_max_entries': 128   # per-cache entry cap for price histories
+}
+
+# Persisted symbol -> first/last trading day index (see utils/trading_index.py)
+TRADING_INDEX_CONFIG = {
+    'path': 'trading_dates.sqlite',  # env: WS101_TRADING_INDEX ("" disables persistence)
+    'max_age': 24 * 3600             # seconds before an entry's last trading day is refreshed
+}
+
+# Calendar-driven cache TTLs (see utils/market_calendar.py)
+MARKET_CALENDAR_CONFIG = {
+    'quote_ttl_open': 60,       # seconds a quote stays fresh while the market is open
+    'close_grace': 20 * 60,     # wait after a session close for the final daily bar
+    'fallback_ttl': 3600,       # used if no session is found within search_days
+    'failed_fetch_ttl': 60,     # an empty (failed) history fetch is retried after this
+    'search_days': 14
+}
+
+# Background prefetching of likely-next charts (see utils/prefetch.py)
+PREFETCH_CONFIG = {
+    'enabled': True,
+    'workers': 2,
+    'wait_timeout': 10.0,        # seconds a page waits on an in-flight prefetch
+    'figure_max_entries': 64
+}
+
+# Shared market data provider session (see utils/provider.py)
+PROVIDER_CONFIG = {
+    'pool_size': 8,             # worker threads / kept-alive connections
+    'connect_timeout': 5,       # seconds
+    'read_timeout': 20,         # seconds
+    'retries': 2,
+    'retry_backoff': 0.5,       # seconds, doubled per retry
+    'impersonate': 'chrome'     # curl_cffi browser fingerprint (what yfinance uses)
+}
+
+# TinyLFU admission in front of the history caches (see utils/admission.py)
+ADMISSION_CONFIG = {
+    'enabled': True,
+    'sketch_width_per_entry': 8,    # count-min counters per row, per cache entry
+    'sketch_depth': 4,
+    'sample_factor': 10,            # age the sketch every sample_factor * capacity accesses
+    'window_fraction': 0.05,        # share of entries kept in the admission window (at least one)
+    'access_trace_path': None       # env: WS101_ACCESS_TRACE (JSONL, replay with benchmarks.admission)
+}
+
+# Batch analyzer (see utils/batch.py)
+BATCH_CONFIG = {
+    'max_symbols': 500,
+    'chunk_size': 25,           # symbols per multi-ticker download
+    'workers': 4,               # concurrent chunk downloads
+    'row_cache_entries': 2000
+}
+
+# Multi-symbol comparison (see utils/compare.py)
+COMPARE_CONFIG = {
+    'max_symbols': 5,
+    'periods': ['6mo', '1y', '3y', '5y'],
+    'default_period': '1y',
+    'cache_entries': 32
+}
+
+# Rolling volatility / Sharpe / beta (see utils/rolling.py)
+ROLLING_CONFIG = {
+    'benchmark': 'SPY',             # beta reference; stats use sessions shared with it
+    'windows': [20, 63, 126, 252],  # trading days (1 month, quarter, half year, year)
+    'default_window': 63,
+    'periods_per_year': 252,
+    'risk_free_rate': 0.0,          # annual; 0 makes Sharpe mean return / volatility
+    'chart_sessions': 1260,         # sessions drawn in the rolling chart (about 5 years)
+    'cache_entries': 64
+}
+
+# Inline SVG sparklines for list views (see utils/helpers.get_sparkline)
+SPARKLINE_CONFIG = {
+    'width': 120,               # px; the series is downsampled to one min/max pair per pixel column
+    'height': 32,
+    'range': '1Y',              # a CHART_RANGES key
+    'cache_entries': 1000
+}
@@ -2,10 +2,20 @@
 Stock analyzer page functionality for the Wall Street 101 application.
 """
 
+import time
+
 import streamlit as st
-import yfinance as yf
-from utils.helpers import show_dual_charts, safe_last_close, check_and_award_badges
-from config.constants import DEFAULT_VALUES
+from utils.batch import batch_snapshot, parse_symbols, snapshot_frame
+from utils.compare import get_aligned_closes
+from utils.helpers import (
+    show_dual_charts, safe_last_close, check_and_award_badges, get_ticker_info, get_recent_closes,
+    get_ticker_news, create_comparison_chart, create_correlation_chart, create_rolling_stats_chart,
+    render_chart
+)
+from utils.performance import fragment
+from utils.rolling import get_rolling_stats
+from config.constants import DEFAULT_VALUES, BATCH_CONFIG, COMPARE_CONFIG, ROLLING_CONFIG
+from utils.tracing import traced
 
 
 def page_stock_analyzer():
@@ -13,6 +23,14 @@ def page_stock_analyzer():
     st.title("🕵️ Stock Analyzer")
     st.markdown("Get a complete snapshot of any stock or crypto. View charts, key data, and news all in one place.")
 
+    mode = st.radio("Mode", ["Single Symbol", "Compare", "Batch"], horizontal=True, label_visibility="collapsed")
+    if mode == "Batch":
+        _show_batch_analyzer()
+        return
+    if mode == "Compare":
+        _show_comparison()
+        return
+
     symbol = st.text_input(
         "Enter a US Stock or Crypto Symbol (e.g., AAPL, TSLA, BTC-USD)", 
         value=DEFAULT_VALUES['analyzer_symbol']
@@ -21,18 +39,18 @@ def page_stock_analyzer():
     if st.button("Analyze"):
         st.session_state.analyzer_uses += 1
         check_and_award_badges()
+        st.session_state.analyzed_symbol = symbol
+
+    # Keep showing the analysis while chart controls (timeframe) rerun the page
+    if symbol and st.session_state.get('analyzed_symbol') == symbol:
         _analyze_stock(symbol)
 
 
+@traced("analyzer.analyze_stock")
 def _analyze_stock(symbol):
     """Analyzes a stock and displays comprehensive information."""
-    ticker = yf.Ticker(symbol)
-    
-    # Get stock info
-    try:
-        info = ticker.info
-    except Exception:
-        info = {}
+    # Get stock info (cached with a market-hours-aware TTL)
+    info = get_ticker_info(symbol)
     
     # Get current price with fallback
     price = _get_current_price(symbol, info)
@@ -46,9 +64,34 @@ def _analyze_stock(symbol):
     # Display interactive chart
     st.subheader("Interactive Chart")
     show_dual_charts(symbol, 'price')
+    _show_rolling_risk(symbol)
 
     # Display company info and news
-    _display_company_info_and_news(info, ticker)
+    _display_company_info_and_news(symbol, info)
+
+
+@fragment
+def _show_rolling_risk(symbol):
+    """Rolling volatility, Sharpe and beta; changing the window reruns only this section."""
+    st.subheader("Rolling Risk")
+    window = st.radio(
+        "Window (trading days)", ROLLING_CONFIG['windows'],
+        index=ROLLING_CONFIG['windows'].index(ROLLING_CONFIG['default_window']),
+        horizontal=True, key=f"rolling_window_{symbol}"
+    )
+    stats = get_rolling_stats(symbol, window)
+    if stats is None:
+        st.info("Not enough price history for rolling statistics.")
+        return
+
+    latest = stats.latest()
+    cols = st.columns(3)
+    cols[0].metric("Volatility (ann.)", f"{latest['volatility']:.1%}")
+    cols[1].metric("Sharpe Ratio", f"{latest['sharpe']:.2f}")
+    cols[2].metric(f"Beta vs {ROLLING_CONFIG['benchmark']}", f"{latest['beta']:.2f}")
+    render_chart(create_rolling_stats_chart(
+        symbol, stats, ROLLING_CONFIG['benchmark'], sessions=ROLLING_CONFIG['chart_sessions']
+    ))
 
 
 def _get_current_price(symbol, info):
@@ -93,19 +136,16 @@ def _get_previous_close(symbol, info, current_price):
     """Gets the previous close price with fallback."""
     prev_close = info.get('previousClose')
     if prev_close is None:
-        try:
-            import yfinance as yf
-            d2 = yf.download(symbol, period="2d", interval="1d", progress=False, auto_adjust=True)
-            if len(d2["Close"].dropna()) >= 2:
-                prev_close = float(d2["Close"].dropna().iloc[-2])
-            else:
-                prev_close = current_price
-        except Exception:
+        closes = get_recent_closes(symbol)
+        if closes is not None and len(closes) >= 2:
+            prev_close = float(closes.iloc[-2])
+        else:
             prev_close = current_price
     return prev_close
 
 
-def _display_company_info_and_news(info, ticker):
+@traced("analyzer.company_info_and_news")
+def _display_company_info_and_news(symbol, info):
     """Displays company profile and recent news."""
     cols = st.columns(2)
     
@@ -125,13 +165,13 @@ def _display_company_info_and_news(info, ticker):
 
     with cols[1]:
         st.subheader("Recent News")
-        _display_news(ticker)
+        _display_news(symbol)
 
 
-def _display_news(ticker):
+def _display_news(symbol):
     """Displays recent news for the stock."""
     try:
-        news = ticker.news
+        news = get_ticker_news(symbol)
         if not news:
             st.write("No recent news found.")
             return
@@ -142,4 +182,144 @@ def _display_news(ticker):
             publisher = item.get('publisher', 'No Publisher')
             st.markdown(f"**[{title}]({link})** - *{publisher}*")
     except Exception as e:
-        st.warning(f"Could not retrieve news. Error: {e}")
\ No newline at end of file
+        st.warning(f"Could not retrieve news. Error: {e}")
+
+
+# --- Multi-symbol comparison ---
+
+COMPARE_COLUMN_CONFIG = {
+    'Last Price': st.column_config.NumberColumn(format="$%.2f"),
+    'Return %': st.column_config.NumberColumn(format="%.1f%%"),
+    'Volatility % (ann.)': st.column_config.NumberColumn(format="%.1f%%"),
+    'Max Drawdown %': st.column_config.NumberColumn(format="%.1f%%"),
+    'Best Day %': st.column_config.NumberColumn(format="%.2f%%"),
+    'Worst Day %': st.column_config.NumberColumn(format="%.2f%%")
+}
+
+
+def _show_comparison():
+    """Compare mode: 2-5 symbols on one normalized chart, a metrics table and a correlation heatmap."""
+    cols = st.columns([3, 1])
+    text = cols[0].text_input(
+        f"Enter 2-{COMPARE_CONFIG['max_symbols']} symbols to compare",
+        value="AAPL, MSFT, SPY"
+    )
+    period = cols[1].selectbox(
+        "Period", COMPARE_CONFIG['periods'],
+        index=COMPARE_CONFIG['periods'].index(COMPARE_CONFIG['default_period'])
+    )
+    if not st.button("Compare", type="primary"):
+        return
+
+    symbols, rejected = parse_symbols(text, limit=COMPARE_CONFIG['max_symbols'])
+    if rejected:
+        st.warning(f"Skipped invalid entries: {', '.join(rejected)}")
+    if len(symbols) < 2:
+        st.error("Please enter at least two valid symbols.")
+        return
+    st.session_state.analyzer_uses += 1
+    st.session_state.charts_viewed += 1
+    check_and_award_badges()
+    _compare_symbols(symbols, period)
+
+
+@traced("analyzer.compare")
+def _compare_symbols(symbols, period):
+    aligned, missing = get_aligned_closes(symbols, period)
+    if missing:
+        st.warning(f"No data for: {', '.join(missing)}")
+    if aligned is None:
+        st.error("Need price data for at least two symbols to compare.")
+        return
+
+    st.caption(
+        f"{len(aligned.dates)} shared sessions from {aligned.dates[0]:%Y-%m-%d} to {aligned.dates[-1]:%Y-%m-%d}"
+        + (" (crypto aligned to stock market days)" if aligned.periods_per_year == 252
+           and any(s.endswith("-USD") for s in aligned.symbols) else "")
+    )
+    render_chart(create_comparison_chart(aligned))
+
+    cols = st.columns([3, 2])
+    with cols[0]:
+        st.subheader("Metrics")
+        st.dataframe(aligned.metrics(), column_config=COMPARE_COLUMN_CONFIG, hide_index=True,
+                     use_container_width=True)
+    with cols[1]:
+        render_chart(create_correlation_chart(aligned))
+
+
+# --- Batch analyzer ---
+
+BATCH_COLUMN_CONFIG = {
+    'Price': st.column_config.NumberColumn(format="$%.2f"),
+    'Change %': st.column_config.NumberColumn(format="%.2f%%"),
+    'Market Cap ($B)': st.column_config.NumberColumn(format="%.1f"),
+    'P/E': st.column_config.NumberColumn(format="%.1f"),
+    '1Y Return %': st.column_config.NumberColumn(format="%.1f%%"),
+    'Trend': st.column_config.ImageColumn("1Y Trend"),
+    '52W Low': st.column_config.NumberColumn(format="$%.2f"),
+    '52W High': st.column_config.NumberColumn(format="$%.2f"),
+    'vs 50D MA %': st.column_config.NumberColumn(format="%.1f%%"),
+    'vs 200D MA %': st.column_config.NumberColumn(format="%.1f%%")
+}
+
+
+def _show_batch_analyzer():
+    """Batch mode: a sortable snapshot table for a pasted or uploaded ticker list."""
+    st.markdown(
+        f"Paste up to {BATCH_CONFIG['max_symbols']} tickers (separated by commas, spaces or new lines) "
+        "or upload a CSV/TXT file. Click any column header to sort."
+    )
+    text = st.text_area("Tickers", placeholder="AAPL, MSFT, NVDA, SPY, BTC-USD", height=120)
+    upload = st.file_uploader("...or upload a list", type=["csv", "txt"])
+    include_fundamentals = st.checkbox(
+        "Include market cap and P/E (one extra request per symbol; untick for faster large lists)", value=True
+    )
+
+    if st.button("Analyze Batch", type="primary"):
+        source = text + "\n" + (upload.getvalue().decode("utf-8", errors="ignore") if upload else "")
+        symbols, rejected = parse_symbols(source)
+        if rejected:
+            st.warning(f"Skipped {len(rejected)} invalid entries: {', '.join(rejected[:10])}")
+        if not symbols:
+            st.error("Please enter at least one valid symbol.")
+            return
+        st.session_state.analyzer_uses += 1
+        check_and_award_badges()
+        st.session_state.batch_rows = _run_batch(symbols, include_fundamentals)
+    elif st.session_state.get('batch_rows'):
+        # Re-render the last batch (e.g. after another widget changed) without refetching
+        _show_batch_table(st.empty(), st.session_state.batch_rows)
+        _show_batch_failures(st.session_state.batch_rows)
+
+
+@traced("analyzer.batch")
+def _run_batch(symbols, include_fundamentals):
+    """Streams rows into the table as chunks complete; returns all rows."""
+    progress = st.progress(0.0, text=f"Fetching {len(symbols)} symbols...")
+    table = st.empty()
+    rows = []
+    last_draw = 0.0
+    for row in batch_snapshot(symbols, include_fundamentals):
+        rows.append(row)
+        progress.progress(len(rows) / len(symbols), text=f"{len(rows)} / {len(symbols)} symbols")
+        if time.monotonic() - last_draw > 0.5:
+            _show_batch_table(table, rows)
+            last_draw = time.monotonic()
+    progress.empty()
+    _show_batch_table(table, rows)
+    _show_batch_failures(rows)
+    return rows
+
+
+def _show_batch_table(placeholder, rows):
+    frame = snapshot_frame(row for row in rows if not row.get('Error')).drop(columns=['Error'])
+    placeholder.dataframe(frame, column_config=BATCH_COLUMN_CONFIG, hide_index=True, use_container_width=True)
+
+
+def _show_batch_failures(rows):
+    failures = [row for row in rows if row.get('Error')]
+    if failures:
+        with st.expander(f"⚠️ {len(failures)} symbols could not be loaded"):
+            for row in failures:
+                st.markdown(f"- **{row['Symbol']}**: {row['Error']}")
@@ -4,7 +4,9 @@ Learning modules page functionality for the Wall Street 101 application.
 
 import streamlit as st
 from data.vocabulary import VOCAB
-from utils.helpers import show_dual_charts, check_and_award_badges
+from utils.helpers import show_dual_charts, check_and_award_badges, prefetch_dual_charts
+from utils.performance import fragment
+from utils.tracing import trace, traced
 
 
 def page_learning_modules():
@@ -25,17 +27,76 @@ def page_learning_modules():
         st.session_state.active_quiz = None 
         st.rerun()
 
-    module_name = st.session_state.current_module
+    _learning_panel(st.session_state.current_module)
+
+
+@fragment
+def _learning_panel(module_name):
+    """
+    Shows the current card or its quiz. Runs as a fragment: quiz answers and
+    card navigation rerun only this panel, and every button updates state
+    in an on_click callback so each click costs a single (fragment) run.
+    """
     module_vocab = VOCAB[module_name]
     card_index = st.session_state.card_indices.get(module_name, 0)
     card = module_vocab[card_index]
 
-    # Main logic for displaying either the quiz or the flashcard
-    if st.session_state.active_quiz and st.session_state.active_quiz['card_index'] == card_index:
-        _handle_quiz_display(card, module_name, card_index, module_vocab)
+    # A root trace on fragment-only reruns, a child span on full reruns
+    with trace("fragment.learning_panel", module=module_name, card=card_index):
+        # Main logic for displaying either the quiz or the flashcard
+        if st.session_state.active_quiz and st.session_state.active_quiz['card_index'] == card_index:
+            _handle_quiz_display(card, module_name, card_index, module_vocab)
+        else:
+            _show_flashcard(card, module_name, card_index, module_vocab)
+
+    # Warm the next card's charts while this card or its quiz is being read
+    _prefetch_next_card(module_vocab, card_index)
+
+
+def _prefetch_next_card(module_vocab, card_index):
+    """Starts building the next card's charts in the background."""
+    if card_index + 1 < len(module_vocab):
+        next_card = module_vocab[card_index + 1]
+        if next_card.get("chart"):
+            prefetch_dual_charts(next_card["chart"], next_card.get("concept", "price"))
+
+
+# --- Button callbacks (run before the panel re-renders) ---
+
+def _start_quiz(module_name, card_index):
+    st.session_state.active_quiz = {
+        'module': module_name, 
+        'card_index': card_index, 
+        'level': 1, 
+        'status': 'pending'
+    }
+
+
+def _submit_answer(module_name, card_index, level, answer_index, correct_index):
+    st.session_state.active_quiz['user_answer'] = answer_index
+    if answer_index == correct_index:
+        st.session_state.active_quiz['status'] = 'passed'
+        try:
+            st.session_state.module_questions_answered[module_name].add((card_index, level))
+        except Exception:
+            st.session_state.module_questions_answered[module_name] = {(card_index, level)}
     else:
-        _show_flashcard(card, module_name, card_index, module_vocab)
+        st.session_state.active_quiz['status'] = 'failed'
+
+
+def _retry_quiz(next_level=False):
+    if next_level:
+        st.session_state.active_quiz['level'] += 1
+    st.session_state.active_quiz['status'] = 'pending'
+    st.session_state.active_quiz.pop('user_answer', None)
+
 
+def _go_to_card(module_name, card_index):
+    st.session_state.card_indices[module_name] = card_index
+    st.session_state.active_quiz = None
+
+
+# --- Quiz views ---
 
 def _handle_quiz_display(card, module_name, card_index, module_vocab):
     """Handles the quiz display and logic."""
@@ -67,21 +128,13 @@ def _display_quiz(card, module_name, card_index):
 
     for i, option in enumerate(quiz_data['options']):
         with cols[i % 2]:
-            if st.button(
+            st.button(
                 option['text'], 
                 key=f"quiz_{module_name}_{card_index}_{level}_{i}", 
-                use_container_width=True
-            ):
-                st.session_state.active_quiz['user_answer'] = i
-                if i == quiz_data['correct']:
-                    st.session_state.active_quiz['status'] = 'passed'
-                    try:
-                        st.session_state.module_questions_answered[module_name].add((card_index, level))
-                    except Exception:
-                        st.session_state.module_questions_answered[module_name] = {(card_index, level)}
-                else:
-                    st.session_state.active_quiz['status'] = 'failed'
-                st.rerun()
+                use_container_width=True,
+                on_click=_submit_answer,
+                args=(module_name, card_index, level, i, quiz_data['correct'])
+            )
 
 
 def _handle_quiz_success(card, module_name, card_index, module_vocab, quiz_level, quiz_data):
@@ -100,19 +153,23 @@ def _handle_quiz_success(card, module_name, card_index, module_vocab, quiz_level
     
     # Option to try a harder question
     if quiz_level < len(card['quiz']):
-        if cols[0].button(f"Try Level {quiz_level + 1} Question", use_container_width=True):
-            st.session_state.active_quiz['level'] += 1
-            st.session_state.active_quiz['status'] = 'pending'
-            st.session_state.active_quiz.pop('user_answer', None)
-            st.rerun()
+        cols[0].button(
+            f"Try Level {quiz_level + 1} Question", 
+            use_container_width=True, 
+            on_click=_retry_quiz, 
+            kwargs={'next_level': True}
+        )
 
     # Option to move to the next card
     with cols[1]:
         if card_index < len(module_vocab) - 1:
-            if st.button("Continue to Next Concept →", type="primary", use_container_width=True):
-                st.session_state.card_indices[module_name] = min(card_index + 1, len(module_vocab) - 1)
-                st.session_state.active_quiz = None
-                st.rerun()
+            st.button(
+                "Continue to Next Concept →", 
+                type="primary", 
+                use_container_width=True,
+                on_click=_go_to_card,
+                args=(module_name, min(card_index + 1, len(module_vocab) - 1))
+            )
         else:
             st.balloons()
             st.success("🎉 You've completed the module! Select a new one from the sidebar.")
@@ -125,12 +182,12 @@ def _handle_quiz_failure(quiz_data):
     st.warning(f"**Here's a common point of confusion:** {quiz_data['options'][user_answer_index]['reasoning']}")
     
     st.markdown("---")
-    if st.button("Try Again", use_container_width=True, type="primary"):
-        st.session_state.active_quiz['status'] = 'pending'
-        st.session_state.active_quiz.pop('user_answer', None)
-        st.rerun()
+    st.button("Try Again", use_container_width=True, type="primary", on_click=_retry_quiz)
+
 
+# --- Flashcard views ---
 
+@traced("learning.flashcard")
 def _show_flashcard(card, module_name, card_index, module_vocab):
     """Shows the flashcard content."""
     st.header(f"{module_name} ({card_index + 1}/{len(module_vocab)})")
@@ -155,31 +212,29 @@ def _show_flashcard(card, module_name, card_index, module_vocab):
 def _show_quiz_buttons(card, module_name, card_index):
     """Shows quiz-related buttons."""
     if card_index >= st.session_state.module_progress.get(module_name, 0):
-        if st.button("Test My Understanding", key=f"test_{card_index}", type="primary", use_container_width=True):
-            st.session_state.active_quiz = {
-                'module': module_name, 
-                'card_index': card_index, 
-                'level': 1, 
-                'status': 'pending'
-            }
-            st.rerun()
+        st.button(
+            "Test My Understanding", 
+            key=f"test_{card_index}", 
+            type="primary", 
+            use_container_width=True,
+            on_click=_start_quiz,
+            args=(module_name, card_index)
+        )
     else:
         st.success("✅ You've mastered this topic. Feel free to review or move on.")
         with st.expander("Quick Review (Key Points)"):
-            card = VOCAB[st.session_state.current_module][card_index]
             st.markdown(f"- Term: {card['term']}")
             st.markdown(f"- Definition (one-liner): {card['definition'][:180]}{'...' if len(card['definition'])>180 else ''}")
             if card.get("example"):
                 st.markdown(f"- Example: {card['example'][:180]}{'...' if len(card['example'])>180 else ''}")
         
-        if st.button("Review Quiz", key=f"review_{card_index}", use_container_width=True):
-            st.session_state.active_quiz = {
-                'module': st.session_state.current_module, 
-                'card_index': card_index, 
-                'level': 1, 
-                'status': 'pending'
-            }
-            st.rerun()
+        st.button(
+            "Review Quiz", 
+            key=f"review_{card_index}", 
+            use_container_width=True,
+            on_click=_start_quiz,
+            args=(module_name, card_index)
+        )
 
 
 def _show_navigation_buttons(module_name, card_index, module_vocab):
@@ -189,16 +244,10 @@ def _show_navigation_buttons(module_name, card_index, module_vocab):
     
     with cols[0]:
         if card_index > 0:
-            if st.button("← Previous"):
-                st.session_state.card_indices[module_name] -= 1
-                st.session_state.active_quiz = None
-                st.rerun()
+            st.button("← Previous", on_click=_go_to_card, args=(module_name, card_index - 1))
     
     with cols[1]:
         # Allow moving to the next card if it has been unlocked
         if (card_index < st.session_state.module_progress.get(module_name, 0) and 
             card_index < len(module_vocab) - 1):
-            if st.button("Next →"):
-                st.session_state.card_indices[module_name] += 1
-                st.session_state.active_quiz = None
-                st.rerun()
\ No newline at end of file
+            st.button("Next →", on_click=_go_to_card, args=(module_name, card_index + 1))
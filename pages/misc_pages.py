@@ -2,9 +2,13 @@
 Funds explorer and achievements pages for the Wall Street 101 application.
 """
 
+import math
+
 import streamlit as st
 from data.vocabulary import FUNDS, BADGES
-from utils.helpers import show_dual_charts, check_and_award_badges
+from utils.helpers import show_dual_charts, check_and_award_badges, get_sparkline
+from utils.rolling import get_rolling_stats
+from config.constants import ROLLING_CONFIG, SPARKLINE_CONFIG
 
 
 def page_funds_explorer():
@@ -18,16 +22,41 @@ def page_funds_explorer():
     for fund in FUNDS:
         with st.container():
             st.markdown(f"### {fund['name']}")
+            if fund.get("symbol"):
+                _show_fund_sparkline(fund['symbol'])
             st.markdown(f"**Fund Type:** `{fund['type']}` | **Typical Annual Return:** `{fund['avg_return']}`")
             st.write(fund['description'])
             
             if fund.get("symbol"):
+                _show_fund_risk(fund['symbol'])
                 with st.expander(f"View Chart for {fund['symbol']}"):
                     show_dual_charts(fund['symbol'], 'price')
             
             st.markdown("---")
 
 
+def _show_fund_sparkline(symbol):
+    """Inline SVG trend glance (the full charts stay in the expander below)."""
+    svg = get_sparkline(symbol)
+    if svg:
+        st.markdown(
+            f"{svg} <small style='color:#BDBDBD'>{symbol}, last {SPARKLINE_CONFIG['range']}</small>",
+            unsafe_allow_html=True
+        )
+
+
+def _show_fund_risk(symbol):
+    """One line of trailing-year risk statistics for a fund."""
+    stats = get_rolling_stats(symbol, 252)
+    latest = stats.latest() if stats is not None else {}
+    if not latest or math.isnan(latest['volatility']):  # NaN until a full year of data
+        return
+    st.caption(
+        f"Last 12 months: volatility **{latest['volatility']:.1%}**, "
+        f"Sharpe **{latest['sharpe']:.2f}**, beta vs {ROLLING_CONFIG['benchmark']} **{latest['beta']:.2f}**"
+    )
+
+
 def page_achievements():
     """Renders the achievements page."""
     st.title("🏅 Your Achievements")
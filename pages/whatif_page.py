@@ -3,13 +3,18 @@ What If calculator page functionality for the Wall Street 101 application.
 """
 
 import streamlit as st
-import yfinance as yf
 import datetime
 import random
 import plotly.graph_objs as go
 
 from data.vocabulary import FUN_FACTS
-from utils.helpers import get_full_history, check_and_award_badges
+from utils.metrics import REGISTRY
+from utils.risk import drawdown
+from utils.tracing import traced
+from utils.helpers import (
+    get_full_history, get_trading_date_range, check_and_award_badges, encode_prices, render_chart,
+    prefetch_full_history, create_underwater_chart
+)
 
 
 def page_what_if_calculator():
@@ -20,41 +25,49 @@ def page_what_if_calculator():
     # Show random fun fact with button to try it
     _show_fun_fact()
 
-    # Get current symbol for validation
+    # Get current symbol for validation (from the trading-date index, no price data)
     symbol_for_validation = st.session_state.what_if_symbol.upper()
-    history_data = get_full_history(symbol_for_validation)
-
-    first_trading_day, last_trading_day = _get_trading_date_range(history_data)
+    first_trading_day, last_trading_day = get_trading_date_range(symbol_for_validation)
 
     # Create input form
     _show_input_form(first_trading_day, last_trading_day)
 
 
+def _pick_fun_fact():
+    """Shows a new fun fact (another one than the current), counts it as read and prefetches it."""
+    current = st.session_state.get('what_if_fact')
+    fact = random.choice([f for f in FUN_FACTS if current is None or f['fact'] != current['fact']] or FUN_FACTS)
+    st.session_state.what_if_fact = fact
+    st.session_state.facts_read += 1
+    check_and_award_badges()
+    # Fetch the fact's closes in the background so trying it is instant
+    prefetch_full_history(fact['symbol'], columns=('Close',))
+
+
 def _show_fun_fact():
-    """Shows a random fun fact with option to try it."""
-    fact = random.choice(FUN_FACTS)
-    if st.button("Try this fun fact!"):
+    """Shows a random fun fact with options to try it or read another one."""
+    # Kept across reruns: the rerun after "Try" must use the fact that was shown
+    if 'what_if_fact' not in st.session_state:
+        _pick_fun_fact()
+    cols = st.columns([1, 1, 3])
+    if cols[0].button("Try this fun fact!"):
+        fact = st.session_state.what_if_fact
         st.session_state.what_if_symbol = fact['symbol']
         st.session_state.what_if_start_date = datetime.datetime.strptime(fact['start'], "%Y-%m-%d").date()
         st.session_state.what_if_amount = 1000
         st.rerun()
-    st.info(f"💡 **Fun Fact:** {fact['fact']}")
-
-
-def _get_trading_date_range(history_data):
-    """Gets the first and last trading days from history data."""
-    first_trading_day = None
-    last_trading_day = None
-
-    if not history_data.empty:
-        first_trading_day = history_data.index[0].date()
-        last_trading_day = history_data.index[-1].date()
-
-    return first_trading_day, last_trading_day
+    if cols[1].button("Another fact"):
+        _pick_fun_fact()
+    st.info(f"💡 **Fun Fact:** {st.session_state.what_if_fact['fact']}")
 
 
 def _show_input_form(first_trading_day, last_trading_day):
     """Shows the input form for the what-if calculation."""
+    # Keep the default inside the picker's bounds (the symbol may have changed)
+    start_value = st.session_state.what_if_start_date
+    if first_trading_day is not None:
+        start_value = min(max(start_value, first_trading_day), last_trading_day)
+
     with st.form(key='what_if_form'):
         cols = st.columns([2, 1, 1])
         
@@ -65,7 +78,7 @@ def _show_input_form(first_trading_day, last_trading_day):
     
         start_date = cols[1].date_input(
             "Investment Date", 
-            value=st.session_state.what_if_start_date,
+            value=start_value,
             min_value=first_trading_day,
             max_value=last_trading_day
         )
@@ -91,13 +104,11 @@ def _handle_calculation(symbol, start_date, amount, first_trading_day):
     st.session_state.what_if_uses += 1
     check_and_award_badges()
 
-    # Re-check history if symbol changed
-    history_data = get_full_history(symbol)
-    if not history_data.empty:
-        first_trading_day = history_data.index[0].date()
+    # Re-check trading dates if symbol changed
+    first_trading_day, _ = get_trading_date_range(symbol)
 
     # Validate inputs
-    if history_data.empty:
+    if first_trading_day is None:
         st.error(f"Invalid symbol '{symbol}'. Please enter a valid stock or crypto symbol.")
         return
 
@@ -109,24 +120,20 @@ def _handle_calculation(symbol, start_date, amount, first_trading_day):
     _calculate_investment_growth(symbol, start_date, amount)
 
 
+@traced("whatif.calculate_investment_growth")
 def _calculate_investment_growth(symbol, start_date, amount):
     """Calculates and displays investment growth."""
-    end_date = datetime.date.today()
-    
     try:
-        data = yf.download(
-            symbol, 
-            start=start_date.strftime('%Y-%m-%d'), 
-            end=end_date.strftime('%Y-%m-%d'), 
-            progress=False
-        )
+        # Served from the cached max history: only the Close column is kept
+        data = get_full_history(symbol, columns=('Close',)).since(start_date)
         
         if data.empty:
             st.error(f"No data found for '{symbol}' in the specified date range. It may not have been trading yet.")
             return
     
-        start_price = float(data.iloc[0]['Close'])
-        end_price = float(data.iloc[-1]['Close'])
+        closes = data['Close']
+        start_price = float(closes[0])
+        end_price = float(closes[-1])
         amount_float = float(amount)
     
         shares = amount_float / start_price
@@ -142,18 +149,23 @@ def _calculate_investment_growth(symbol, start_date, amount):
         # Create and display growth chart
         _create_growth_chart(data, shares, amount_float, symbol)
 
+        if len(data) > 1:
+            _show_drawdown(drawdown(data), shares, symbol)
+
     except Exception as e:
         st.error(f"An error occurred. Please check the symbol and date. Error: {e}")
 
 
+@traced("figure.growth")
+@REGISTRY.timed('figure_build_seconds', figure='growth')
 def _create_growth_chart(data, shares, amount_float, symbol):
     """Creates and displays the investment growth chart."""
-    data['Investment Value'] = (shares * data['Close'])
+    investment_value = shares * data['Close']
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=data.index, 
-        y=data['Investment Value'], 
+        x=data.epoch_ms(), 
+        y=encode_prices(investment_value), 
         mode='lines', 
         name='Investment Growth', 
         fill='tozeroy', 
@@ -163,8 +175,35 @@ def _create_growth_chart(data, shares, amount_float, symbol):
     fig.update_layout(
         title=f'Growth of ${amount_float:,.2f} in {symbol}', 
         yaxis_title='Value (USD)', 
-        template='plotly_dark'
+        template='plotly_dark',
+        xaxis_type='date'
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    st.session_state.charts_viewed += 1
\ No newline at end of file
+    render_chart(fig)
+    st.session_state.charts_viewed += 1
+
+
+def _format_days(days):
+    return f"{days / 365.25:.1f} years" if days >= 365 else f"{days} days"
+
+
+def _show_drawdown(dd, shares, symbol):
+    """Shows the worst peak-to-trough loss along the way and the underwater chart."""
+    st.subheader("📉 The Bumpy Ride")
+    cols = st.columns(3)
+    cols[0].metric("Max Drawdown", f"{dd.max_drawdown:.1%}")
+    cols[1].metric("Longest Time Below a High", _format_days(dd.max_duration_days))
+    cols[2].metric(
+        "Recovery Time",
+        _format_days(dd.recovery_days) if dd.recovery_days is not None else "Not yet recovered"
+    )
+
+    st.markdown(
+        f"At its worst, your investment fell from **${shares * dd.peak_value:,.2f}** "
+        f"({dd.peak_date}) to **${shares * dd.trough_value:,.2f}** ({dd.trough_date}) "
+        f"over {_format_days(dd.decline_days)}."
+    )
+    if dd.current_drawdown < 0:
+        st.caption(f"It is currently {-dd.current_drawdown:.1%} below its highest value.")
+
+    render_chart(create_underwater_chart(dd, f'{symbol} Drawdown from Previous High'))
@@ -0,0 +1,138 @@
+"""
+Frequency-aware cache admission for the Wall Street 101 application.
+A W-TinyLFU policy: new entries first land in a small LRU window, and an
+entry leaving the window is only kept if a TinyLFU filter (count-min sketch
+with periodic aging) rates it above the cache's LRU victim. A new symbol is
+thus cached while it is being looked at, but a burst of one-off symbols
+cannot flush the hot ones. Curated symbols can be pinned.
+Cache accesses can also be recorded to a replayable JSONL trace.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config.constants import ADMISSION_CONFIG
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counts in `depth` rows of `width` saturating 8-bit
+    counters. Every `sample_size` increments all counters are halved, so
+    frequencies track recent popularity instead of all-time totals.
+    """
+
+    MAX_COUNT = 255
+
+    def __init__(self, width: int, depth: int, sample_size: int):
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size
+        self._rows = [bytearray(width) for _ in range(depth)]
+        self._additions = 0
+
+    def _indexes(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=4 * self.depth).digest()
+        for row in range(self.depth):
+            yield row, int.from_bytes(digest[4 * row:4 * row + 4], "little") % self.width
+
+    def increment(self, item: str):
+        indexes = list(self._indexes(item))
+        current = min(self._rows[row][i] for row, i in indexes)
+        if current < self.MAX_COUNT:
+            # Conservative update: only raise the counters that hold the minimum
+            for row, i in indexes:
+                if self._rows[row][i] == current:
+                    self._rows[row][i] = current + 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, item: str) -> int:
+        return min(self._rows[row][i] for row, i in self._indexes(item))
+
+    def _age(self):
+        for row in self._rows:
+            row[:] = bytes(count >> 1 for count in row)
+        self._additions //= 2
+
+
+class TinyLFUAdmission:
+    """
+    Admission policy for LRUCache. `key_func` maps a cache key to the item
+    whose frequency is tracked (e.g. the symbol of a (symbol, period) key);
+    pinned items are always admitted and are the last to be evicted.
+    `window_size` of the cache's entries form the admission window.
+    """
+
+    def __init__(self, capacity: int, pinned=(), key_func=str,
+                 width: int = None, depth: int = ADMISSION_CONFIG['sketch_depth']):
+        width = width or max(ADMISSION_CONFIG['sketch_width_per_entry'] * capacity, 64)
+        sample_size = ADMISSION_CONFIG['sample_factor'] * max(capacity, 1)
+        self.sketch = CountMinSketch(width, depth, sample_size=sample_size)
+        self.window_size = max(1, round(ADMISSION_CONFIG['window_fraction'] * capacity))
+        self.pinned = frozenset(pinned)
+        self._key_func = key_func
+        self._lock = threading.Lock()
+
+    def record(self, key):
+        """Counts one access (hit or miss) to a cache key."""
+        item = self._key_func(key)
+        with self._lock:
+            self.sketch.increment(item)
+
+    def is_pinned(self, key) -> bool:
+        return self._key_func(key) in self.pinned
+
+    def admit(self, candidate, victim) -> bool:
+        """Whether `candidate`, leaving the window, should replace `victim` in a full cache."""
+        if self.is_pinned(candidate):
+            return True
+        if self.is_pinned(victim):
+            return False
+        with self._lock:
+            return self.sketch.estimate(self._key_func(candidate)) > self.sketch.estimate(self._key_func(victim))
+
+
+class AccessTrace:
+    """
+    Appends cache accesses as JSONL lines ({"t", "cache", "key"}) so the
+    same workload can be replayed against different policies
+    (see benchmarks/admission.py). Disabled unless a path is configured.
+    """
+
+    def __init__(self, path: str = None):
+        if path is None:
+            path = os.environ.get("WS101_ACCESS_TRACE", ADMISSION_CONFIG['access_trace_path'])
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(self, cache_name: str, key):
+        if not self.path:
+            return
+        line = json.dumps({'t': round(time.time(), 3), 'cache': cache_name, 'key': list(key)})
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            self.path = None  # stop tracing rather than failing page renders
+
+
+def load_access_trace(path: str, cache_name: str = None) -> list:
+    """Reads a recorded trace back as a list of keys (tuples), optionally for one cache."""
+    keys = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if cache_name is None or record['cache'] == cache_name:
+                keys.append(tuple(record['key']))
+    return keys
+
+
+ACCESS_TRACE = AccessTrace()
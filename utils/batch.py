@@ -0,0 +1,161 @@
+"""
+Batch symbol snapshots for the Wall Street 101 application.
+Turns a pasted or uploaded list of tickers into one summary row per symbol
+(price, daily change, 1y return, 52-week range, distance from the 50/200-day
+moving averages, optionally market cap and P/E). Histories are downloaded
+in multi-symbol chunks on a bounded pool and rows are yielded as each chunk
+completes, so a page can stream them into a table. A failing symbol becomes
+an error row instead of aborting the batch.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config.constants import BATCH_CONFIG, MOVING_AVERAGE_PERIODS
+from utils.helpers import get_sparkline, get_ticker_info, svg_data_url
+from utils.market_calendar import quote_ttl
+from utils.metrics import REGISTRY
+from utils.performance import LRUCache, lazy_import
+from utils.provider import PROVIDER
+from utils.tracing import span
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+SYMBOL_PATTERN = re.compile(r"^\^?[A-Z0-9][A-Z0-9.\-=]{0,14}$")
+HEADER_TOKENS = frozenset({"SYMBOL", "SYMBOLS", "TICKER", "TICKERS"})
+
+SNAPSHOT_COLUMNS = (
+    'Symbol', 'Price', 'Change %', 'Market Cap ($B)', 'P/E', '1Y Return %', 'Trend',
+    '52W Low', '52W High', 'vs 50D MA %', 'vs 200D MA %', 'Error'
+)
+
+
+def parse_symbols(text: str, limit: int = BATCH_CONFIG['max_symbols']):
+    """
+    Splits pasted text or an uploaded CSV/TXT into unique, upper-cased
+    symbols (first occurrence wins). Returns (symbols, rejected tokens).
+    """
+    symbols, rejected, seen = [], [], set()
+    for token in re.split(r"[\s,;|\t]+", text.upper()):
+        token = token.strip().strip('"\'')
+        if not token or token in seen or token in HEADER_TOKENS:
+            continue
+        seen.add(token)
+        if SYMBOL_PATTERN.match(token):
+            symbols.append(token)
+        else:
+            rejected.append(token)
+    return symbols[:limit], rejected
+
+
+def _error_row(symbol: str, message: str) -> dict:
+    return {'Symbol': symbol, 'Error': message}
+
+
+def _snapshot_row(symbol: str, frame) -> dict:
+    """Summary row from one symbol's 1y daily OHLC frame."""
+    close = frame['Close'].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(close)
+    if valid.sum() < 2:
+        return _error_row(symbol, "No price data")
+    close = close[valid]
+    high = frame['High'].to_numpy(dtype=np.float64)[valid]
+    low = frame['Low'].to_numpy(dtype=np.float64)[valid]
+
+    price = close[-1]
+    row = {
+        'Symbol': symbol,
+        'Price': price,
+        'Change %': (price / close[-2] - 1) * 100,
+        '1Y Return %': (price / close[0] - 1) * 100,
+        'Trend': svg_data_url(get_sparkline(symbol, '1Y', closes=close)),
+        '52W Low': np.nanmin(low),
+        '52W High': np.nanmax(high)
+    }
+    for label, window in (('vs 50D MA %', MOVING_AVERAGE_PERIODS['short']),
+                          ('vs 200D MA %', MOVING_AVERAGE_PERIODS['long'])):
+        row[label] = (price / close[-window:].mean() - 1) * 100 if len(close) >= window else None
+    return row
+
+
+def _download_chunk(symbols):
+    """One multi-symbol provider call; returns {symbol: row}."""
+    with span("provider.download_batch", symbols=len(symbols)), \
+            REGISTRY.timer('provider_fetch_seconds', call='download_batch'):
+        data = PROVIDER.download(
+            symbols, period="1y", interval="1d", group_by="ticker",
+            auto_adjust=True, progress=False, threads=False
+        )
+    rows = {}
+    for symbol in symbols:
+        try:
+            if isinstance(data.columns, pd.MultiIndex):
+                frame = data[symbol] if symbol in data.columns.get_level_values(0) else None
+            else:
+                frame = data if len(symbols) == 1 else None
+            rows[symbol] = _error_row(symbol, "No price data") if frame is None else _snapshot_row(symbol, frame)
+        except Exception as e:
+            rows[symbol] = _error_row(symbol, str(e) or type(e).__name__)
+    return rows
+
+
+def _fundamentals(symbol: str) -> dict:
+    info = get_ticker_info(symbol)
+    pe = info.get('trailingPE')
+    market_cap = info.get('marketCap')
+    return {
+        'Market Cap ($B)': market_cap / 1e9 if isinstance(market_cap, (int, float)) else None,
+        'P/E': pe if isinstance(pe, (int, float)) else None
+    }
+
+
+def _row_ttl(key, row):
+    return quote_ttl(key[0])
+
+
+# Finished rows, so re-running the same class list is instant
+ROW_CACHE = LRUCache('batch_rows', max_entries=BATCH_CONFIG['row_cache_entries'], ttl=_row_ttl)
+
+
+def batch_snapshot(symbols, include_fundamentals: bool = False,
+                   chunk_size: int = BATCH_CONFIG['chunk_size'], workers: int = BATCH_CONFIG['workers']):
+    """
+    Yields one row dict per symbol, in completion order. Cached rows come
+    first; the rest are downloaded `chunk_size` symbols per provider call on
+    at most `workers` threads.
+    """
+    missing = []
+    for symbol in symbols:
+        found, row = ROW_CACHE.get((symbol, include_fundamentals))
+        if found:
+            yield row
+        else:
+            missing.append(symbol)
+    if not missing:
+        return
+
+    chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        futures = {pool.submit(_download_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                rows = future.result()
+            except Exception as e:
+                rows = {symbol: _error_row(symbol, str(e) or type(e).__name__) for symbol in futures[future]}
+
+            if include_fundamentals:
+                ok = [s for s, row in rows.items() if not row.get('Error')]
+                for symbol, extra in zip(ok, pool.map(_fundamentals, ok)):
+                    rows[symbol].update(extra)
+
+            for symbol, row in rows.items():
+                if not row.get('Error'):
+                    ROW_CACHE.put((symbol, include_fundamentals), row, tag='batch')
+                REGISTRY.counter('batch_symbols_total', outcome='failed' if row.get('Error') else 'ok').inc()
+                yield row
+
+
+def snapshot_frame(rows):
+    """Rows as a DataFrame in SNAPSHOT_COLUMNS order."""
+    return pd.DataFrame(list(rows), columns=list(SNAPSHOT_COLUMNS))
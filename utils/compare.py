@@ -0,0 +1,148 @@
+"""
+Multi-symbol comparison data for the Wall Street 101 application.
+Fetches 2-5 symbols in one batched provider call and aligns their closes
+on a shared calendar with a single vectorized reindex: when any equity is
+in the mix, weekend/holiday crypto prints are dropped so every symbol is
+compared session by session; an all-crypto comparison keeps every day.
+"""
+
+import math
+
+from config.constants import COMPARE_CONFIG
+from utils.market_calendar import CRYPTO, calendar_for, daily_data_ttl
+from utils.metrics import REGISTRY
+from utils.performance import LRUCache, lazy_import
+from utils.provider import PROVIDER
+from utils.risk import max_drawdown
+from utils.tracing import span, traced
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+
+class AlignedCloses:
+    """
+    Closes of several symbols on one date index (no gaps after the common
+    start), plus the derived daily returns and their correlation matrix.
+    """
+
+    def __init__(self, symbols, dates, closes, periods_per_year: int):
+        self.symbols = list(symbols)
+        self.dates = dates                  # DatetimeIndex, tz-naive sessions
+        self.closes = closes                # float64 array, shape (n_dates, n_symbols)
+        self.periods_per_year = periods_per_year
+
+    @property
+    def empty(self) -> bool:
+        return len(self.dates) < 2
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.closes.nbytes + self.dates.nbytes)
+
+    def normalized(self):
+        """Each symbol rebased to 100 on the common start date."""
+        return self.closes / self.closes[0] * 100.0
+
+    def returns(self):
+        return self.closes[1:] / self.closes[:-1] - 1.0
+
+    def correlation(self):
+        return np.corrcoef(np.log1p(self.returns()), rowvar=False)
+
+    def metrics(self):
+        """Per-symbol summary rows for the comparison table."""
+        returns = self.returns()
+        volatility = returns.std(axis=0, ddof=1) * math.sqrt(self.periods_per_year) * 100
+        total = (self.closes[-1] / self.closes[0] - 1) * 100
+        drawdowns = max_drawdown(self.closes) * 100
+        rows = []
+        for i, symbol in enumerate(self.symbols):
+            rows.append({
+                'Symbol': symbol,
+                'Last Price': self.closes[-1, i],
+                'Return %': total[i],
+                'Volatility % (ann.)': volatility[i],
+                'Max Drawdown %': drawdowns[i],
+                'Best Day %': returns[:, i].max() * 100,
+                'Worst Day %': returns[:, i].min() * 100
+            })
+        return rows
+
+
+def _session_index(frame, symbols):
+    """Target calendar: equity sessions if any equity is present, else every day."""
+    equities = [s for s in symbols if calendar_for(s) is not CRYPTO]
+    if not equities:
+        return frame.index, 365
+    traded = frame[equities].notna().any(axis=1).to_numpy()
+    return frame.index[traded], 252
+
+
+def align_closes(frame, symbols) -> AlignedCloses:
+    """
+    Aligns a (dates x symbols) close frame: restrict to the shared calendar
+    with one reindex, forward-fill gaps (e.g. a symbol-specific holiday),
+    then start where every symbol has a price.
+    """
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = frame.set_axis(index.normalize()).groupby(level=0).last()
+
+    sessions, periods_per_year = _session_index(frame, symbols)
+    aligned = frame.reindex(sessions, columns=symbols).ffill().dropna()
+    return AlignedCloses(symbols, aligned.index, aligned.to_numpy(dtype=np.float64), periods_per_year)
+
+
+def _download_closes(symbols, period: str):
+    """One provider call for all symbols; returns a (dates x symbols) close frame."""
+    with span("provider.download_batch", symbols=len(symbols), period=period), \
+            REGISTRY.timer('provider_fetch_seconds', call='download_batch'):
+        data = PROVIDER.download(
+            symbols, period=period, interval="1d", group_by="ticker",
+            auto_adjust=True, progress=False, threads=False
+        )
+    if data is None or data.empty:
+        return None
+    if isinstance(data.columns, pd.MultiIndex):
+        present = [s for s in symbols if s in data.columns.get_level_values(0)]
+        return pd.DataFrame({s: data[s]['Close'] for s in present})
+    return pd.DataFrame({symbols[0]: data['Close']})
+
+
+def _comparison_ttl(key, aligned):
+    return min(daily_data_ttl(symbol) for symbol in key[0])
+
+
+COMPARISON_CACHE = LRUCache('comparisons', max_entries=COMPARE_CONFIG['cache_entries'], ttl=_comparison_ttl)
+
+
+@traced("compare.aligned_closes")
+def get_aligned_closes(symbols, period: str = COMPARE_CONFIG['default_period']):
+    """
+    Returns (AlignedCloses or None, symbols without data). Cached per
+    (symbols, period) with the daily-bar TTL of the soonest-closing market.
+    """
+    key = (tuple(symbols), period)
+    found, cached = COMPARISON_CACHE.get(key)
+    if found:
+        return cached
+
+    try:
+        frame = _download_closes(list(symbols), period)
+    except Exception:
+        frame = None
+    if frame is None:
+        return None, list(symbols)
+
+    missing = [s for s in symbols if s not in frame.columns or frame[s].notna().sum() < 2]
+    available = [s for s in symbols if s not in missing]
+    if len(available) < 2:
+        return None, missing
+    with span("compute.align", symbols=len(available)):
+        aligned = align_closes(frame[available], available)
+    result = (aligned if not aligned.empty else None, missing)
+    if result[0] is not None:
+        COMPARISON_CACHE.put(key, result, nbytes=aligned.nbytes, tag='compare')
+    return result
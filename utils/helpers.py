@@ -4,52 +4,249 @@ Contains data fetching, session state management, and chart functions.
 """
 
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import plotly.graph_objs as go
-from plotly.subplots import make_subplots
+import base64
 import datetime
+import json
+
+from utils.metrics import REGISTRY
+from utils.performance import LRUCache, estimate_nbytes, fragment, lazy_import
+from utils.tracing import span, traced
+from utils.history import HISTORY_COLUMNS, MS_PER_DAY, TIMEFRAMES, PriceHistory, ProjectedHistoryCache, rolling_mean
+from utils.indicators import volume_profile
+from utils.patterns import PATTERNS, detect_patterns
+from utils.trading_index import TRADING_DATES
+from utils.market_calendar import daily_data_ttl, quote_ttl
+from utils.prefetch import PREFETCHER
+from utils.provider import PROVIDER
+from utils.admission import ACCESS_TRACE, TinyLFUAdmission
+
+# Heavy dependencies are only imported once a chart or data call needs them,
+# so pages such as Home never pay for pandas, plotly or yfinance (which is
+# only reached through the shared PROVIDER session).
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+go = lazy_import('plotly.graph_objs')
+pio = lazy_import('plotly.io')
+plotly_subplots = lazy_import('plotly.subplots')
+plotly_utils = lazy_import('plotly.utils')
 
 from config.constants import (
-    CACHE_TIMEOUT_SHORT, CACHE_TIMEOUT_LONG, DEFAULT_CHART_PERIOD,
+    DEFAULT_CHART_PERIOD, CHART_RANGES, DEFAULT_CHART_RANGE, SHORT_CHART_RANGE_MONTHS,
     CHART_HEIGHT_SIMPLE, CHART_HEIGHT_ANALYTICAL, MOVING_AVERAGE_PERIODS,
-    BADGES_CONFIG
+    BADGES_CONFIG, CACHE_CONFIG, COLORS, MARKET_CALENDAR_CONFIG, PREFETCH_CONFIG, ADMISSION_CONFIG,
+    SPARKLINE_CONFIG, DEFAULT_VALUES
 )
-from data.vocabulary import VOCAB, BADGES
+from data.vocabulary import VOCAB, BADGES, FUNDS, FUN_FACTS
 
 
 # --- Data Fetching Functions ---
 
-@st.cache_data(ttl=CACHE_TIMEOUT_SHORT)
-def get_stock_data(symbol, period=DEFAULT_CHART_PERIOD):
-    """Fetch stock data with caching."""
+def _fetch_history(symbol, period):
+    """Provider call behind the history caches; always returns every column."""
     try:
-        return yf.Ticker(symbol).history(period=period, auto_adjust=True)
+        with span("provider.history", symbol=symbol, period=period), \
+                REGISTRY.timer('provider_fetch_seconds', call=f'history_{period}', symbol=symbol):
+            frame = PROVIDER.call(PROVIDER.ticker(symbol).history, period=period, auto_adjust=True)
+        history = PriceHistory.from_frame(symbol, frame)
     except Exception:
-        return pd.DataFrame()
+        return PriceHistory.blank(symbol)
+    if not history.empty:
+        # Only a max-period fetch knows the symbol's first trading day
+        TRADING_DATES.record(
+            symbol,
+            first_day=history.first_date if period == "max" else None,
+            last_day=history.last_date
+        )
+    return history
+
+
+def _daily_bars_ttl(key, history):
+    """Daily bars cannot change before the symbol's next session close."""
+    return daily_data_ttl(key[0])
+
+
+def _history_ttl(key, history):
+    """Like _daily_bars_ttl, but a failed or rate-limited (empty) fetch is retried soon."""
+    if history.empty:
+        return MARKET_CALENDAR_CONFIG['failed_fetch_ttl']
+    return _daily_bars_ttl(key, history)
+
 
+def _quote_ttl(key, quote):
+    """Quotes only move while the symbol's market is open."""
+    return quote_ttl(key)
 
-@st.cache_data(ttl=CACHE_TIMEOUT_LONG)
-def get_full_history(symbol):
-    """Gets the entire price history for a stock to find its first trading day."""
+
+# Symbols the app itself links to: learning cards, funds, fun facts, defaults
+CURATED_SYMBOLS = frozenset(
+    [card['chart'] for cards in VOCAB.values() for card in cards if card.get('chart')]
+    + [fund['symbol'] for fund in FUNDS]
+    + [fact['symbol'] for fact in FUN_FACTS]
+    + [DEFAULT_VALUES['what_if_symbol'], DEFAULT_VALUES['analyzer_symbol']]
+)
+
+
+def _history_admission():
+    """TinyLFU admission keyed by symbol, with the curated symbols pinned."""
+    if not ADMISSION_CONFIG['enabled']:
+        return None
+    return TinyLFUAdmission(
+        CACHE_CONFIG['history_max_entries'], pinned=CURATED_SYMBOLS, key_func=lambda key: key[0]
+    )
+
+
+# Histories live in size-accounted caches so they count against the global
+# memory budget (CACHE_CONFIG) and show up per symbol in the debug view.
+# Each cache only keeps the columns callers have requested, and a burst of
+# one-off symbols cannot flush frequently used or curated ones.
+HISTORY_CACHES = {
+    'stock_data': ProjectedHistoryCache(
+        'stock_data', _fetch_history, ttl=_history_ttl,
+        max_entries=CACHE_CONFIG['history_max_entries'], admission=_history_admission()
+    ),
+    'full_history': ProjectedHistoryCache(
+        'full_history', _fetch_history, ttl=_history_ttl,
+        max_entries=CACHE_CONFIG['history_max_entries'], admission=_history_admission()
+    )
+}
+
+# Last prices, quote summaries and news, keyed by symbol
+QUOTE_CACHES = {
+    'last_close': LRUCache('last_close', max_entries=CACHE_CONFIG['history_max_entries'], ttl=_quote_ttl),
+    'ticker_info': LRUCache('ticker_info', max_entries=CACHE_CONFIG['history_max_entries'], ttl=_quote_ttl),
+    'ticker_news': LRUCache('ticker_news', max_entries=CACHE_CONFIG['history_max_entries'], ttl=_quote_ttl)
+}
+
+
+def _cached_history(cache_name, symbol, period, columns):
+    """Looks up a history projection, recording lookup latency and a trace span."""
+    ACCESS_TRACE.record(cache_name, (symbol, period))
+    with span(f"cache.{cache_name}", symbol=symbol, period=period, columns=list(columns)) as s, \
+            REGISTRY.timer('cache_lookup_seconds', cache=cache_name):
+        history, hit = HISTORY_CACHES[cache_name].lookup(symbol, period, columns)
+    if s is not None:
+        s.attrs['hit'] = hit
+    return history
+
+
+def get_stock_data(symbol, period=DEFAULT_CHART_PERIOD, columns=HISTORY_COLUMNS):
+    """
+    Fetch stock data with caching, as a compact PriceHistory holding only
+    `columns` (arrays are shared with the cache: do not mutate them).
+    """
+    return _cached_history('stock_data', symbol, period, columns)
+
+
+def get_full_history(symbol, columns=HISTORY_COLUMNS):
+    """
+    Gets the entire price history for a stock. Pass `columns=()` when only
+    the trading dates are needed.
+    """
+    return _cached_history('full_history', symbol, "max", columns)
+
+
+# Resampled bars keyed by symbol, timeframe, columns and the daily data's
+# version (length and date span), so a refetch never serves stale bars.
+RESAMPLE_CACHE = LRUCache('resampled', max_entries=CACHE_CONFIG['history_max_entries'], ttl=_daily_bars_ttl)
+
+
+def resample_history(history, timeframe):
+    """Weekly/monthly/quarterly bars from cached daily bars ('D' returns `history`)."""
+    if timeframe == 'D' or history.empty:
+        return history
+    key = (history.symbol, timeframe, history.columns, len(history), int(history.days[0]), int(history.days[-1]))
+    found, resampled = RESAMPLE_CACHE.get(key)
+    if not found:
+        with span("compute.resample", symbol=history.symbol, timeframe=timeframe):
+            resampled = history.resample(timeframe)
+        RESAMPLE_CACHE.put(key, resampled, tag=history.symbol)
+    return resampled
+
+
+# Volume profiles keyed by symbol, chart range and the daily data's version
+PROFILE_CACHE = LRUCache('volume_profiles', max_entries=PREFETCH_CONFIG['figure_max_entries'], ttl=_daily_bars_ttl)
+
+
+def get_volume_profile(history, chart_range):
+    """Volume-by-price of the daily bars visible in `chart_range` (see CHART_RANGES)."""
+    key = (history.symbol, chart_range, len(history), int(history.days[0]), int(history.days[-1]))
+    found, profile = PROFILE_CACHE.get(key)
+    if not found:
+        with span("compute.volume_profile", symbol=history.symbol, chart_range=chart_range):
+            start = history.range_start(CHART_RANGES[chart_range])
+            profile = volume_profile(history.tail(len(history) - start))
+        PROFILE_CACHE.put(key, profile, nbytes=profile.nbytes, tag=history.symbol)
+    return profile
+
+
+# Candlestick pattern masks keyed like RESAMPLE_CACHE (one entry per bar timeframe)
+PATTERN_CACHE = LRUCache('candle_patterns', max_entries=PREFETCH_CONFIG['figure_max_entries'], ttl=_daily_bars_ttl)
+
+
+def get_candle_patterns(bars, timeframe='D'):
+    """Pattern masks (see utils.patterns.PATTERNS) for OHLC bars at a timeframe."""
+    key = (bars.symbol, timeframe, len(bars), int(bars.days[0]), int(bars.days[-1]))
+    found, patterns = PATTERN_CACHE.get(key)
+    if not found:
+        with span("compute.candle_patterns", symbol=bars.symbol, timeframe=timeframe):
+            patterns = detect_patterns(bars)
+        PATTERN_CACHE.put(key, patterns, nbytes=sum(m.nbytes for m in patterns.values()), tag=bars.symbol)
+    return patterns
+
+
+def get_trading_date_range(symbol):
+    """
+    Returns (first_trading_day, last_trading_day) for a symbol, or (None, None)
+    for an unknown one. Served from the persisted trading-date index when
+    possible; otherwise the full history is fetched, which fills the index.
+    """
+    with span("trading_index.lookup", symbol=symbol) as s:
+        dates = TRADING_DATES.lookup(symbol)
+        if s is not None:
+            s.attrs['hit'] = dates is not None
+    if dates is not None:
+        return dates
+
+    history = get_full_history(symbol, columns=())
+    if history.empty:
+        return None, None
+    return history.first_date, history.last_date
+
+
+def get_ticker_info(symbol: str) -> dict:
+    """Quote summary for a symbol (empty dict on failure, which is not cached)."""
+    found, info = QUOTE_CACHES['ticker_info'].get(symbol)
+    if found:
+        return info
     try:
-        return yf.Ticker(symbol).history(period="max", auto_adjust=True)
+        with span("provider.info", symbol=symbol), \
+                REGISTRY.timer('provider_fetch_seconds', call='info', symbol=symbol):
+            info = PROVIDER.call(lambda: PROVIDER.ticker(symbol).info)
     except Exception:
-        return pd.DataFrame()
+        return {}
+    if info:
+        QUOTE_CACHES['ticker_info'].put(symbol, info, tag=symbol)
+    return info or {}
 
 
 def safe_last_close(symbol: str):
     """Safe last price helper for robust analyzer fallback."""
+    found, price = QUOTE_CACHES['last_close'].get(symbol)
+    if found:
+        return price
+    price = _fetch_last_close(symbol)
+    if price is not None:
+        QUOTE_CACHES['last_close'].put(symbol, price, tag=symbol)
+    return price
+
+
+def _fetch_last_close(symbol: str):
+    closes = get_recent_closes(symbol)
+    if closes is not None:
+        return float(closes.iloc[-1])
     try:
-        d = yf.download(symbol, period="2d", interval="1d", progress=False, auto_adjust=True)
-        if isinstance(d, pd.DataFrame) and not d.empty and "Close" in d.columns:
-            return float(d["Close"].dropna().iloc[-1])
-    except Exception:
-        pass
-    try:
-        t = yf.Ticker(symbol)
-        fi = getattr(t, "fast_info", None)
-        p = getattr(fi, "last_price", None) if fi else None
+        with REGISTRY.timer('provider_fetch_seconds', call='fast_info', symbol=symbol):
+            p = PROVIDER.call(lambda: getattr(PROVIDER.ticker(symbol).fast_info, "last_price", None))
         if p is not None and not pd.isna(p):
             return float(p)
     except Exception:
@@ -57,6 +254,35 @@ def safe_last_close(symbol: str):
     return None
 
 
+def get_recent_closes(symbol: str, period: str = "2d"):
+    """Recent daily closes from a lightweight download, or None on failure."""
+    try:
+        with span("provider.download", symbol=symbol), \
+                REGISTRY.timer('provider_fetch_seconds', call='download', symbol=symbol):
+            d = PROVIDER.download(symbol, period=period, interval="1d", progress=False, auto_adjust=True)
+    except Exception:
+        return None
+    if not isinstance(d, pd.DataFrame) or d.empty or "Close" not in d.columns:
+        return None
+    closes = d["Close"]
+    if closes.ndim == 2:
+        closes = closes.iloc[:, 0]  # newer yfinance returns one column per ticker
+    closes = closes.dropna()
+    return closes if len(closes) else None
+
+
+def get_ticker_news(symbol: str) -> list:
+    """Recent news items for a symbol; provider errors propagate to the caller and are not cached."""
+    found, news = QUOTE_CACHES['ticker_news'].get(symbol)
+    if found:
+        return news
+    with span("provider.news", symbol=symbol), \
+            REGISTRY.timer('provider_fetch_seconds', call='news', symbol=symbol):
+        news = PROVIDER.call(lambda: PROVIDER.ticker(symbol).news)
+    QUOTE_CACHES['ticker_news'].put(symbol, news, tag=symbol)
+    return news
+
+
 # --- Session State Management ---
 
 def init_session_state():
@@ -71,6 +297,8 @@ def init_session_state():
         st.session_state.badges = set()
     if 'charts_viewed' not in st.session_state:
         st.session_state.charts_viewed = 0
+    if 'viewed_charts' not in st.session_state:
+        st.session_state.viewed_charts = set()
     if 'facts_read' not in st.session_state:
         st.session_state.facts_read = 0
     if 'analyzer_uses' not in st.session_state:
@@ -119,24 +347,115 @@ def check_and_award_badges():
         st.session_state.badges.add("Trading Legend")
 
 
+# --- Chart Payload Encoding ---
+# Plotly (>= 6) ships contiguous NumPy arrays to the browser as base64 typed
+# arrays instead of JSON number lists, so chart builders hand it compact
+# arrays and put dates on the x-axis as epoch milliseconds.
+
+def encode_dates(index):
+    """Converts a datetime index into epoch milliseconds for a date-typed axis."""
+    if isinstance(index, PriceHistory):
+        return index.epoch_ms()
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        # Keep the exchange's wall-clock dates rather than shifting them to UTC
+        idx = idx.tz_localize(None)
+    return idx.values.astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+
+
+def encode_prices(values):
+    """Packs a price series into a float32 array (ample precision for display)."""
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+
+def encode_volume(values):
+    """Packs volume into uint32 when it fits, falling back to float64."""
+    arr = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    if arr.size and arr.min() >= 0 and arr.max() <= np.iinfo(np.uint32).max:
+        return arr.astype(np.uint32)
+    return np.ascontiguousarray(arr)
+
+
+def _expand_typed_arrays(node, key=None):
+    """Rebuilds the JSON-list form of a figure dict, as sent before encoding."""
+    if isinstance(node, dict):
+        if set(node) == {'dtype', 'bdata'}:
+            values = np.frombuffer(base64.b64decode(node['bdata']), dtype=np.dtype(node['dtype']))
+            if key == 'x' and node['dtype'] == 'f8':
+                # x arrays built by this module are always epoch-ms dates
+                return np.datetime_as_string(values.astype('datetime64[ms]')).tolist()
+            return values.tolist()
+        return {k: _expand_typed_arrays(v, k) for k, v in node.items()}
+    if isinstance(node, (list, tuple)):
+        return [_expand_typed_arrays(v, key) for v in node]
+    return node
+
+
+def chart_payload_sizes(fig):
+    """Returns (encoded, json_lists) payload sizes in bytes for a figure."""
+    encoded = pio.to_json(fig, validate=False)
+    legacy = json.dumps(_expand_typed_arrays(json.loads(encoded)), cls=plotly_utils.PlotlyJSONEncoder)
+    return len(encoded.encode('utf-8')), len(legacy.encode('utf-8'))
+
+
+def render_chart(fig):
+    """Sends a figure to the browser, reporting its payload size in debug mode."""
+    with span("render.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+    if st.session_state.get('debug_mode', False):
+        encoded, legacy = chart_payload_sizes(fig)
+        st.caption(
+            f"Chart payload: {encoded / 1024:,.1f} KB "
+            f"(JSON lists: {legacy / 1024:,.1f} KB, {legacy / max(encoded, 1):.1f}x smaller)"
+        )
+
+
 # --- Chart Functions ---
 
-def create_simple_chart(symbol, data, concept):
-    """Create a simplified educational chart."""
+_BAR_UNITS = {'D': 'Day', 'W': 'Week', 'M': 'Month', 'Q': 'Quarter'}
+
+
+def _ma_label(window, timeframe):
+    """Moving averages are taken over bars of the chart's timeframe."""
+    return f"{window}-{_BAR_UNITS[timeframe]} MA"
+
+
+def _chart_title(timeframe, chart_range):
+    """Title suffix such as " (Weekly, 5Y)"; the default daily 1Y view has none."""
+    parts = [TIMEFRAMES[timeframe]] if timeframe != 'D' else []
+    if chart_range != DEFAULT_CHART_RANGE:
+        parts.append(chart_range)
+    return f" ({', '.join(parts)})" if parts else ""
+
+
+@traced("figure.simple")
+@REGISTRY.timed('figure_build_seconds', figure='simple')
+def create_simple_chart(symbol, data, concept, timeframe='D', chart_range=DEFAULT_CHART_RANGE):
+    """
+    Create a simplified educational chart. `data` is the whole history:
+    moving averages are computed on it before slicing to `chart_range`, so
+    they are already warmed up at the left edge of a short range.
+    """
+    start = data.range_start(CHART_RANGES[chart_range])
+    x = data.epoch_ms()[start:]
+    full_close = data['Close']
+    close = full_close[start:]
+
     fig_simple = go.Figure()
     fig_simple.add_trace(go.Scatter(
-        x=data.index, 
-        y=data['Close'], 
+        x=x, 
+        y=encode_prices(close), 
         mode='lines', 
         name='Price', 
         line=dict(color='#00A693', width=2)
     ))
 
     if concept in ['support', 'resistance', 'breakout']:
-        level = data['Close'][-200:].median() if concept == 'support' else data['Close'][-200:].quantile(0.75)
+        recent = close[-200:].astype(np.float64)
+        level = np.nanmedian(recent) if concept == 'support' else np.nanquantile(recent, 0.75)
         color = 'lime' if concept == 'support' else 'red'
         fig_simple.add_hline(
-            y=level, 
+            y=float(level), 
             line_width=2, 
             line_dash="dash", 
             line_color=color,
@@ -144,111 +463,277 @@ def create_simple_chart(symbol, data, concept):
             annotation_position="bottom right"
         )
     elif concept == 'ma':
-        data['MA50'] = data['Close'].rolling(window=MOVING_AVERAGE_PERIODS['short']).mean()
+        with span("compute.moving_averages"):
+            ma50 = rolling_mean(full_close, MOVING_AVERAGE_PERIODS['short'])[start:]
         fig_simple.add_trace(go.Scatter(
-            x=data.index, 
-            y=data['MA50'], 
+            x=x, 
+            y=encode_prices(ma50), 
             mode='lines', 
-            name='50-Day MA', 
+            name=_ma_label(MOVING_AVERAGE_PERIODS['short'], timeframe), 
             line=dict(color='orange', width=1.5)
         ))
     elif concept == 'cross':
-        data['MA50'] = data['Close'].rolling(window=MOVING_AVERAGE_PERIODS['short']).mean()
-        data['MA200'] = data['Close'].rolling(window=MOVING_AVERAGE_PERIODS['long']).mean()
+        with span("compute.moving_averages"):
+            ma50 = rolling_mean(full_close, MOVING_AVERAGE_PERIODS['short'])[start:]
+            ma200 = rolling_mean(full_close, MOVING_AVERAGE_PERIODS['long'])[start:]
         fig_simple.add_trace(go.Scatter(
-            x=data.index, 
-            y=data['MA50'], 
+            x=x, 
+            y=encode_prices(ma50), 
             mode='lines', 
-            name='50-Day MA', 
+            name=_ma_label(MOVING_AVERAGE_PERIODS['short'], timeframe), 
             line=dict(color='orange', width=1.5)
         ))
         fig_simple.add_trace(go.Scatter(
-            x=data.index, 
-            y=data['MA200'], 
+            x=x, 
+            y=encode_prices(ma200), 
             mode='lines', 
-            name='200-Day MA', 
+            name=_ma_label(MOVING_AVERAGE_PERIODS['long'], timeframe), 
             line=dict(color='purple', width=1.5)
         ))
 
     fig_simple.update_layout(
-        title=f"Simplified View: {symbol}", 
+        title=f"Simplified View: {symbol}" + _chart_title(timeframe, chart_range), 
         template="plotly_dark", 
-        height=CHART_HEIGHT_SIMPLE
+        height=CHART_HEIGHT_SIMPLE,
+        xaxis_type="date"
     )
     return fig_simple
 
 
-def create_analytical_chart(symbol, data):
-    """Create a detailed analytical chart with technical indicators."""
-    fig = make_subplots(
+@traced("figure.analytical")
+@REGISTRY.timed('figure_build_seconds', figure='analytical')
+def create_analytical_chart(symbol, data, timeframe='D', chart_range=DEFAULT_CHART_RANGE, profile=None,
+                            patterns=None):
+    """
+    Create a detailed analytical chart with technical indicators. Like
+    create_simple_chart, moving averages use the whole of `data`. A
+    VolumeProfile is drawn as a volume-by-price histogram along the right
+    edge of the price panel, and candlestick `patterns` (masks over `data`,
+    see get_candle_patterns) as markers above or below their bars.
+    """
+    start = data.range_start(CHART_RANGES[chart_range])
+    x = data.epoch_ms()[start:]
+    full_close = data['Close']
+
+    fig = plotly_subplots.make_subplots(
         rows=2, cols=1, 
         shared_xaxes=True, 
         vertical_spacing=0.05,
-        subplot_titles=(f'{symbol.upper()} Price Action', 'Volume'), 
+        subplot_titles=(f'{symbol.upper()} Price Action ({TIMEFRAMES[timeframe]}, {chart_range})', 'Volume'), 
         row_heights=[0.7, 0.3]
     )
     
     # Candlestick chart
     fig.add_trace(go.Candlestick(
-        x=data.index,
-        open=data['Open'],
-        high=data['High'],
-        low=data['Low'],
-        close=data['Close'],
+        x=x,
+        open=encode_prices(data['Open'][start:]),
+        high=encode_prices(data['High'][start:]),
+        low=encode_prices(data['Low'][start:]),
+        close=encode_prices(full_close[start:]),
         name='Price'
     ), row=1, col=1)
     
     # Volume chart
     fig.add_trace(go.Bar(
-        x=data.index, 
-        y=data['Volume'], 
+        x=x, 
+        y=encode_volume(data['Volume'][start:]), 
         name='Volume', 
         marker_color='rgba(0, 166, 147, 0.5)'
     ), row=2, col=1)
     
     # Moving averages
-    data['MA50'] = data['Close'].rolling(window=MOVING_AVERAGE_PERIODS['short']).mean()
-    data['MA200'] = data['Close'].rolling(window=MOVING_AVERAGE_PERIODS['long']).mean()
+    with span("compute.moving_averages"):
+        ma50 = rolling_mean(full_close, MOVING_AVERAGE_PERIODS['short'])[start:]
+        ma200 = rolling_mean(full_close, MOVING_AVERAGE_PERIODS['long'])[start:]
     
     fig.add_trace(go.Scatter(
-        x=data.index, 
-        y=data['MA50'], 
+        x=x, 
+        y=encode_prices(ma50), 
         mode='lines', 
-        name='50-Day MA', 
+        name=_ma_label(MOVING_AVERAGE_PERIODS['short'], timeframe), 
         line=dict(color='orange', width=1)
     ), row=1, col=1)
     
     fig.add_trace(go.Scatter(
-        x=data.index, 
-        y=data['MA200'], 
+        x=x, 
+        y=encode_prices(ma200), 
         mode='lines', 
-        name='200-Day MA', 
+        name=_ma_label(MOVING_AVERAGE_PERIODS['long'], timeframe), 
         line=dict(color='purple', width=1)
     ), row=1, col=1)
 
+    if profile is not None and not profile.empty:
+        _add_volume_profile(fig, profile)
+    if patterns:
+        _add_pattern_markers(fig, data, start, patterns)
+
     fig.update_layout(
         height=CHART_HEIGHT_ANALYTICAL, 
         template="plotly_dark", 
         xaxis_rangeslider_visible=False,
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
+    fig.update_xaxes(type="date")
     return fig
 
 
+def _add_volume_profile(fig, profile):
+    """
+    Horizontal volume bars on their own x-axis overlaying the price panel.
+    The axis is reversed and spans 4x the largest bin, so bars grow leftwards
+    from the right edge and cover at most a quarter of the panel.
+    """
+    fig.add_trace(go.Bar(
+        x=profile.volumes.astype(np.float32),
+        y=encode_prices(profile.centers),
+        width=profile.bin_width * 0.9,
+        orientation='h',
+        xaxis='x3',
+        yaxis='y',
+        name='Volume Profile',
+        marker_color='rgba(99, 110, 250, 0.3)',
+        hovertemplate='%{y:.2f}: %{x:,.0f}<extra>Volume by Price</extra>'
+    ))
+    fig.add_hline(
+        y=profile.point_of_control, line_width=1, line_dash="dot", line_color="rgba(99, 110, 250, 0.8)",
+        annotation_text="POC", annotation_position="top left", row=1, col=1
+    )
+    fig.update_layout(xaxis3=dict(
+        overlaying='x', side='top', range=[float(profile.volumes.max()) * 4, 0],
+        showgrid=False, showticklabels=False, zeroline=False
+    ))
+
+
+# Marker style per pattern direction: (symbol, color, placement)
+_PATTERN_MARKERS = {
+    'bullish': ('triangle-up', 'lime', 'below'),
+    'bearish': ('triangle-down', 'red', 'above'),
+    'neutral': ('diamond', 'gold', 'above')
+}
+# Frequent patterns start hidden (click the legend to show them)
+_PATTERNS_HIDDEN = ('doji', 'inside_bar')
+
+
+def _add_pattern_markers(fig, data, start, patterns):
+    """One marker trace per detected pattern, restricted to the visible bars."""
+    x = data.epoch_ms()[start:]
+    high, low = data['High'][start:], data['Low'][start:]
+    offset = (np.nanmax(high) - np.nanmin(low)) * 0.02 if len(high) else 0.0
+    for key, (label, direction) in PATTERNS.items():
+        hits = np.flatnonzero(patterns[key][start:])
+        if not len(hits):
+            continue
+        marker, color, placement = _PATTERN_MARKERS[direction]
+        y = low[hits] - offset if placement == 'below' else high[hits] + offset
+        fig.add_trace(go.Scatter(
+            x=x[hits],
+            y=encode_prices(y),
+            mode='markers',
+            name=label,
+            marker=dict(symbol=marker, color=color, size=8),
+            hovertemplate=f'{label}<extra></extra>',
+            visible='legendonly' if key in _PATTERNS_HIDDEN else True
+        ), row=1, col=1)
+
+
+# Built chart figures: simplified ones keyed by (symbol, concept, timeframe,
+# range), analytical ones (which don't depend on the concept) by (symbol,
+# timeframe, range). They expire with the daily bars they were built from.
+FIGURE_CACHE = LRUCache('figures', max_entries=PREFETCH_CONFIG['figure_max_entries'], ttl=_daily_bars_ttl)
+
+
+def _range_history(symbol, chart_range, columns=HISTORY_COLUMNS):
+    """
+    Daily bars to cut `chart_range` from: the default-period history for
+    short ranges (see SHORT_CHART_RANGE_MONTHS), the full history otherwise.
+    """
+    months = CHART_RANGES[chart_range]
+    if months is not None and months <= SHORT_CHART_RANGE_MONTHS:
+        return get_stock_data(symbol, columns=columns)
+    return get_full_history(symbol, columns=columns)
+
+
+def get_dual_chart_figures(symbol, concept, timeframe='D', chart_range=DEFAULT_CHART_RANGE):
+    """
+    Returns (simplified figure, analytical figure) for a symbol at a bar
+    timeframe (see TIMEFRAMES) and range (see CHART_RANGES), or None if it
+    has no data. Short ranges are cut from the cached default-period
+    history and only 5Y/Max load the full one, so switching between short
+    ranges never calls the provider. Figures are shared between sessions:
+    do not mutate them.
+    """
+    simple_key = ('simple', symbol, concept, timeframe, chart_range)
+    analytical_key = ('analytical', symbol, timeframe, chart_range)
+    found_simple, fig_simple = FIGURE_CACHE.get(simple_key)
+    found_analytical, fig_analytical = FIGURE_CACHE.get(analytical_key)
+    if found_simple and found_analytical:
+        return fig_simple, fig_analytical
+
+    # Only the analytical figure needs more than closes
+    data = _range_history(symbol, chart_range, columns=('Close',) if found_analytical else HISTORY_COLUMNS)
+    if data.empty:
+        return None
+    bars = resample_history(data, timeframe)
+    if not found_simple:
+        fig_simple = create_simple_chart(symbol, bars.project(('Close',)), concept, timeframe, chart_range)
+        FIGURE_CACHE.put(simple_key, fig_simple, nbytes=estimate_nbytes(fig_simple.to_plotly_json()), tag=symbol)
+    if not found_analytical:
+        fig_analytical = create_analytical_chart(
+            symbol, bars, timeframe, chart_range,
+            profile=get_volume_profile(data, chart_range), patterns=get_candle_patterns(bars, timeframe)
+        )
+        FIGURE_CACHE.put(analytical_key, fig_analytical,
+                         nbytes=estimate_nbytes(fig_analytical.to_plotly_json()), tag=symbol)
+    return fig_simple, fig_analytical
+
+
+def prefetch_dual_charts(symbol, concept):
+    """Warms the history and figure caches for a chart the student is likely to open next."""
+    PREFETCHER.submit(('dual_charts', symbol, concept), get_dual_chart_figures, symbol, concept)
+
+
+def prefetch_full_history(symbol, columns=HISTORY_COLUMNS):
+    """Warms the full-history cache (and the trading-date index) for a symbol."""
+    PREFETCHER.submit(('full_history', symbol), get_full_history, symbol, columns)
+
+
+@traced("show_dual_charts")
 def show_dual_charts(symbol, concept):
     """Displays both a simplified educational chart and a full analytical chart."""
-    data = get_stock_data(symbol)
-    if data.empty:
+    # Reuse a background prefetch of these charts if one is still running
+    PREFETCHER.wait(('dual_charts', symbol, concept))
+    _dual_charts_panel(symbol, concept)
+
+
+@fragment
+def _dual_charts_panel(symbol, concept):
+    """Timeframe/range pickers and the chart tabs; a pick reruns only this fragment."""
+    timeframe_col, range_col = st.columns(2)
+    with timeframe_col:
+        timeframe = st.radio(
+            "Timeframe", list(TIMEFRAMES), format_func=TIMEFRAMES.get, horizontal=True,
+            key=f"timeframe_{symbol}_{concept}", label_visibility="collapsed"
+        )
+    with range_col:
+        chart_range = st.radio(
+            "Range", list(CHART_RANGES), index=list(CHART_RANGES).index(DEFAULT_CHART_RANGE),
+            horizontal=True, key=f"range_{symbol}_{concept}", label_visibility="collapsed"
+        )
+    figures = get_dual_chart_figures(symbol, concept, timeframe, chart_range)
+    if figures is None:
         st.warning(f"Could not retrieve data for '{symbol}'.")
         return
+    fig_simple, fig_analytical = figures
 
-    st.session_state.charts_viewed += 1
+    # One view per (symbol, concept): timeframe/range picks and page reruns don't count
+    if (symbol, concept) not in st.session_state.viewed_charts:
+        st.session_state.viewed_charts.add((symbol, concept))
+        st.session_state.charts_viewed += 1
 
     simplified_tab, analytical_tab = st.tabs(["🎓 Simplified View", "🔬 Analytical View"])
 
     with simplified_tab:
         st.markdown(f"**Visualizing: {concept.replace('_', ' ').title()}**")
-        fig_simple = create_simple_chart(symbol, data, concept)
         
         # Add educational info based on concept
         if concept in ['support', 'resistance', 'breakout']:
@@ -258,12 +743,125 @@ def show_dual_charts(symbol, concept):
         elif concept == 'cross':
             st.info("This chart shows the 50-day (orange) and 200-day (purple) moving averages. A 'Golden Cross' (orange over purple) is bullish.")
         
-        st.plotly_chart(fig_simple, use_container_width=True)
+        render_chart(fig_simple)
 
     with analytical_tab:
         st.markdown("**Real-World Chart with Technical Indicators**")
-        fig_analytical = create_analytical_chart(symbol, data)
-        st.plotly_chart(fig_analytical, use_container_width=True)
+        render_chart(fig_analytical)
+
+
+@traced("figure.underwater")
+@REGISTRY.timed('figure_build_seconds', figure='underwater')
+def create_underwater_chart(drawdown, title):
+    """Percent below the running high over time (see utils.risk.Drawdown)."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=drawdown.days.astype(np.float64) * MS_PER_DAY,
+        y=encode_prices(drawdown.underwater * 100),
+        mode='lines',
+        name='Drawdown',
+        fill='tozeroy',
+        line_color=COLORS['danger']
+    ))
+    fig.add_hline(
+        y=drawdown.max_drawdown * 100, line_width=1, line_dash="dash", line_color="gray",
+        annotation_text=f"Max drawdown {drawdown.max_drawdown:.1%}", annotation_position="bottom right"
+    )
+    fig.update_layout(
+        title=title,
+        yaxis_title='Below previous high (%)',
+        template='plotly_dark',
+        height=CHART_HEIGHT_SIMPLE,
+        xaxis_type='date'
+    )
+    return fig
+
+
+@traced("figure.rolling_stats")
+@REGISTRY.timed('figure_build_seconds', figure='rolling_stats')
+def create_rolling_stats_chart(symbol, stats, benchmark, sessions=None):
+    """
+    Rolling volatility, Sharpe and beta (see utils.rolling.RollingStats) in
+    three stacked panels, limited to the last `sessions` values if given.
+    """
+    days, volatility, sharpe, beta = (a[-sessions:] if sessions else a for a in stats.series())
+    x = days.astype(np.float64) * MS_PER_DAY
+    fig = plotly_subplots.make_subplots(
+        rows=3, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.06,
+        subplot_titles=('Volatility % (annualized)', 'Sharpe Ratio', f'Beta vs {benchmark}')
+    )
+    for row, (values, color) in enumerate(((volatility * 100, 'orange'), (sharpe, '#00A693'), (beta, '#636EFA')), 1):
+        fig.add_trace(go.Scatter(
+            x=x, y=encode_prices(values), mode='lines', line=dict(color=color, width=1.5), showlegend=False
+        ), row=row, col=1)
+    fig.add_hline(y=0, line_width=1, line_dash="dot", line_color="gray", row=2, col=1)
+    fig.add_hline(y=1, line_width=1, line_dash="dot", line_color="gray", row=3, col=1)
+    fig.update_layout(
+        title=f"{symbol}: {stats.window}-Day Rolling Risk",
+        template='plotly_dark',
+        height=CHART_HEIGHT_ANALYTICAL,
+        hovermode='x unified'
+    )
+    fig.update_xaxes(type="date")
+    return fig
+
+
+COMPARISON_COLORS = ['#00A693', 'orange', '#636EFA', '#EF553B', '#AB63FA']
+
+
+@traced("figure.comparison")
+@REGISTRY.timed('figure_build_seconds', figure='comparison')
+def create_comparison_chart(aligned):
+    """Normalized (start = 100) prices of several symbols on one shared date axis."""
+    x = encode_dates(aligned.dates)
+    normalized = aligned.normalized()
+
+    fig = go.Figure()
+    for i, symbol in enumerate(aligned.symbols):
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=encode_prices(normalized[:, i]),
+            mode='lines',
+            name=symbol,
+            line=dict(color=COMPARISON_COLORS[i % len(COMPARISON_COLORS)], width=2)
+        ))
+    fig.add_hline(y=100, line_width=1, line_dash="dot", line_color="gray")
+    fig.update_layout(
+        title="Growth of 100 (normalized)",
+        yaxis_title="Value (start = 100)",
+        template="plotly_dark",
+        height=CHART_HEIGHT_SIMPLE,
+        hovermode="x unified",
+        xaxis_type="date"
+    )
+    return fig
+
+
+@traced("figure.correlation")
+@REGISTRY.timed('figure_build_seconds', figure='correlation')
+def create_correlation_chart(aligned):
+    """Heatmap of the correlation between the symbols' daily returns."""
+    corr = aligned.correlation()
+    fig = go.Figure(go.Heatmap(
+        z=corr,
+        x=aligned.symbols,
+        y=aligned.symbols,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        reversescale=True,
+        text=np.round(corr, 2),
+        texttemplate="%{text}"
+    ))
+    fig.update_layout(
+        title="Correlation of Daily Returns",
+        template="plotly_dark",
+        height=CHART_HEIGHT_SIMPLE,
+        yaxis_autorange="reversed"
+    )
+    return fig
 
 
 # --- Shield Visualization Functions ---
@@ -307,4 +905,76 @@ def get_shield_level_and_color(module_name):
         else:
             return 1, "#00A693", "Level 1"  # default green
     else:
-        return 1, "#00A693", "Level 1"
\ No newline at end of file
+        return 1, "#00A693", "Level 1"
+
+
+# --- Sparklines ---
+# A trend glance for list views: a few hundred bytes of inline SVG per row
+# instead of a Plotly figure.
+
+SPARKLINE_CACHE = LRUCache('sparklines', max_entries=SPARKLINE_CONFIG['cache_entries'], ttl=_daily_bars_ttl)
+
+
+def create_sparkline_svg(values, width=SPARKLINE_CONFIG['width'], height=SPARKLINE_CONFIG['height'], color=None):
+    """
+    Inline SVG line of a price series (green if it ended higher, else red),
+    or '' with fewer than two prices. Long series keep each pixel column's
+    high and low (in the order they trend), so spikes survive downsampling.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    n = len(values)
+    if n < 2:
+        return ''
+    if n > 2 * width:
+        starts = np.arange(width) * n // width
+        ends = np.append(starts[1:], n) - 1
+        high, low = np.maximum.reduceat(values, starts), np.minimum.reduceat(values, starts)
+        rising = values[ends] >= values[starts]
+        y = np.column_stack((np.where(rising, low, high), np.where(rising, high, low))).ravel()
+        x = np.repeat(np.arange(width) + 0.5, 2) / width
+    else:
+        y = values
+        x = np.linspace(0.0, 1.0, n)
+
+    pad = 1.5
+    lowest, highest = y.min(), y.max()
+    px = pad + x * (width - 2 * pad)
+    py = pad + (highest - y) / ((highest - lowest) or 1.0) * (height - 2 * pad)
+    points = ' '.join(f'{a:.1f},{b:.1f}' for a, b in zip(px.tolist(), py.tolist()))
+    color = color or (COLORS['success'] if values[-1] >= values[0] else COLORS['danger'])
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}"><path d="M{points}" fill="none" stroke="{color}" '
+        f'stroke-width="1.5" stroke-linejoin="round" stroke-linecap="round"/></svg>'
+    )
+
+
+def get_sparkline(symbol, chart_range=SPARKLINE_CONFIG['range'], width=SPARKLINE_CONFIG['width'],
+                  height=SPARKLINE_CONFIG['height'], closes=None):
+    """
+    Sparkline SVG of a symbol's closes over a chart range (see CHART_RANGES),
+    memoized per (symbol, range, size). Pass `closes` when the caller already
+    holds that range (e.g. a batch download) to skip the history lookup;
+    those come from another source than the cached history, so their
+    sparkline is drawn but not memoized.
+    """
+    if closes is not None:
+        return create_sparkline_svg(closes, width, height)
+    key = (symbol, chart_range, width, height)
+    found, svg = SPARKLINE_CACHE.get(key)
+    if found:
+        return svg
+    # Default projection: list views chart the same symbols, and widening a
+    # Close-only entry would refetch it
+    history = _range_history(symbol, chart_range)
+    closes = history['Close'][history.range_start(CHART_RANGES[chart_range]):] if not history.empty else ()
+    svg = create_sparkline_svg(closes, width, height)
+    if svg:
+        SPARKLINE_CACHE.put(key, svg, nbytes=len(svg), tag=symbol)
+    return svg
+
+
+def svg_data_url(svg):
+    """An SVG string as a data URL, e.g. for st.column_config.ImageColumn."""
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode("utf-8")).decode("ascii") if svg else None
@@ -0,0 +1,255 @@
+"""
+Compact price-history container for the Wall Street 101 application.
+Stores daily OHLCV bars as contiguous NumPy arrays instead of a pandas
+DataFrame, which is what the history caches keep in memory.
+"""
+
+import datetime
+import time
+
+from utils.performance import LRUCache, lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+HISTORY_COLUMNS = PRICE_COLUMNS + ('Volume',)
+
+# float32 has 24 bits of mantissa: below 2**16 it resolves prices to better
+# than 0.4 cents. Larger prices (e.g. BRK-A) are kept in float64.
+FLOAT32_PRICE_LIMIT = 2 ** 16
+MS_PER_DAY = 86_400_000
+_EPOCH = datetime.date(1970, 1, 1)
+
+# Bar timeframes a history can be resampled to (code -> label)
+TIMEFRAMES = {'D': 'Daily', 'W': 'Weekly', 'M': 'Monthly', 'Q': 'Quarterly'}
+
+
+class PriceHistory:
+    """
+    Daily OHLCV bars for one symbol.
+
+    `days` holds int64 days since 1970-01-01 (the exchange's local trading
+    date), prices are float32 (float64 when float32 would lose cents) and
+    volume is uint64. Dividends and Stock Splits are not kept.
+    """
+
+    __slots__ = ('symbol', 'days', '_columns')
+
+    def __init__(self, symbol: str, days, columns: dict):
+        self.symbol = symbol
+        self.days = days
+        self._columns = columns
+
+    @classmethod
+    def from_frame(cls, symbol: str, frame, columns=HISTORY_COLUMNS):
+        """Builds a history from provider output (a DatetimeIndex-ed DataFrame)."""
+        if frame is None or frame.empty:
+            return cls.blank(symbol)
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            # Keep the exchange's calendar date, not the UTC one
+            index = index.tz_localize(None)
+        days = index.values.astype('datetime64[D]').astype(np.int64)
+
+        arrays = {}
+        for name in columns:
+            if name not in frame.columns:
+                continue
+            values = frame[name].to_numpy()
+            if values.ndim > 1:  # single-symbol download with MultiIndex columns
+                values = values[:, 0]
+            arrays[name] = _compact_volume(values) if name == 'Volume' else _compact_prices(values)
+        return cls(symbol, days, arrays)
+
+    @classmethod
+    def blank(cls, symbol: str):
+        return cls(symbol, np.empty(0, dtype=np.int64), {})
+
+    # --- Container protocol ---
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getitem__(self, column: str):
+        return self._columns[column]
+
+    def __contains__(self, column: str):
+        return column in self._columns
+
+    @property
+    def empty(self) -> bool:
+        return len(self.days) == 0
+
+    @property
+    def columns(self):
+        return tuple(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (what the cache manager accounts)."""
+        return int(self.days.nbytes + sum(a.nbytes for a in self._columns.values()))
+
+    # --- Dates ---
+
+    @property
+    def dates(self):
+        """Trading dates as a datetime64[D] array (no copy)."""
+        return self.days.view('datetime64[D]')
+
+    @property
+    def first_date(self) -> datetime.date:
+        return _EPOCH + datetime.timedelta(days=int(self.days[0])) if len(self.days) else None
+
+    @property
+    def last_date(self) -> datetime.date:
+        return _EPOCH + datetime.timedelta(days=int(self.days[-1])) if len(self.days) else None
+
+    def epoch_ms(self):
+        """Dates as float64 epoch milliseconds, for a date-typed Plotly axis."""
+        return self.days.astype(np.float64) * MS_PER_DAY
+
+    # --- Slicing and conversion ---
+
+    def project(self, columns) -> "PriceHistory":
+        """Only the given columns, sharing the same arrays (no copy)."""
+        return PriceHistory(self.symbol, self.days, {c: self._columns[c] for c in columns})
+
+    def since(self, start_date: datetime.date) -> "PriceHistory":
+        """Bars on or after `start_date`, as views on the same arrays."""
+        start = int(np.searchsorted(self.days, (start_date - _EPOCH).days, side='left'))
+        return PriceHistory(self.symbol, self.days[start:], {k: v[start:] for k, v in self._columns.items()})
+
+    def tail(self, n: int) -> "PriceHistory":
+        """The last `n` bars, as views on the same arrays."""
+        start = max(len(self.days) - n, 0)
+        return PriceHistory(self.symbol, self.days[start:], {k: v[start:] for k, v in self._columns.items()})
+
+    def range_start(self, months: int = None) -> int:
+        """
+        Index of the first bar within `months` (average-length) months of the
+        last bar; 0 for None. At least two bars are always in range.
+        """
+        if months is None or len(self.days) < 2:
+            return 0
+        cutoff = int(self.days[-1]) - round(months * 365.25 / 12)
+        start = int(np.searchsorted(self.days, cutoff, side='left'))
+        return min(start, len(self.days) - 2)
+
+    def resample(self, timeframe: str) -> "PriceHistory":
+        """
+        Aggregates daily bars into weekly ('W', Monday-based), monthly ('M') or
+        quarterly ('Q') bars: Open first, High max, Low min, Close last, Volume
+        sum. Each bar is dated by its first trading day. Segment reductions
+        (`ufunc.reduceat`) make this one pass per column.
+        """
+        if timeframe == 'D' or not len(self.days):
+            return self
+        keys = _period_keys(self.days, timeframe)
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        ends = np.concatenate((starts[1:], [len(keys)])) - 1
+
+        columns = {}
+        for name, values in self._columns.items():
+            if name == 'Open':
+                columns[name] = values[starts]
+            elif name == 'High':
+                columns[name] = np.fmax.reduceat(values, starts)  # fmax/fmin skip NaN bars
+            elif name == 'Low':
+                columns[name] = np.fmin.reduceat(values, starts)
+            elif name == 'Close':
+                columns[name] = values[ends]
+            else:
+                columns[name] = np.add.reduceat(values, starts)
+        return PriceHistory(self.symbol, self.days[starts], columns)
+
+    def to_frame(self):
+        """A pandas DataFrame view (float columns are not upcast)."""
+        index = pd.DatetimeIndex(self.dates.astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame(dict(self._columns), index=index, copy=False)
+
+    def __repr__(self):
+        span = f"{self.first_date} → {self.last_date}" if len(self) else "empty"
+        return f"<PriceHistory {self.symbol} {len(self)} bars, {span}, {self.nbytes / 1024:.1f} KiB>"
+
+
+class ProjectedHistoryCache:
+    """
+    History cache keyed by (symbol, period) that keeps only the columns
+    callers have asked for. Each request returns a projection sharing the
+    cached arrays. A request for a column that is not cached yet refetches
+    and stores the union of the old and new columns, so memory scales with
+    what pages actually read.
+    """
+
+    def __init__(self, name: str, fetch, ttl, max_entries: int, admission=None):
+        self.name = name
+        self._fetch = fetch  # (symbol, period) -> PriceHistory with all columns
+        self.cache = LRUCache(name, max_entries=max_entries, ttl=ttl, admission=admission)
+
+    def lookup(self, symbol: str, period: str, columns=HISTORY_COLUMNS):
+        """Returns (history projected to `columns`, whether it was a cache hit)."""
+        columns = tuple(columns)
+        key = (symbol, period)
+        found, cached = self.cache.get(key)
+        if found and all(c in cached for c in columns):
+            return cached.project(columns), True
+
+        start = time.perf_counter()
+        fetched = self._fetch(symbol, period)
+        cost = time.perf_counter() - start
+
+        keep = [c for c in HISTORY_COLUMNS if c in fetched and (c in columns or (found and c in cached))]
+        stored = fetched.project(keep)
+        self.cache.put(key, stored, cost=cost, tag=symbol)
+        return stored.project([c for c in columns if c in stored]), False
+
+    def get(self, symbol: str, period: str, columns=HISTORY_COLUMNS) -> PriceHistory:
+        return self.lookup(symbol, period, columns)[0]
+
+    def clear(self):
+        self.cache.clear()
+
+
+def _period_keys(days, timeframe: str):
+    """Integer period id per bar; consecutive equal ids form one resampled bar."""
+    if timeframe == 'W':
+        return (days + 3) // 7  # 1970-01-01 was a Thursday: weeks start on Monday
+    months = days.view('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if timeframe == 'M':
+        return months
+    if timeframe == 'Q':
+        return months // 3
+    raise ValueError(f"Unknown timeframe {timeframe!r}; expected one of {', '.join(TIMEFRAMES)}")
+
+
+def _compact_prices(values):
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    if finite.size and np.abs(finite).max() >= FLOAT32_PRICE_LIMIT:
+        return np.ascontiguousarray(values)
+    return values.astype(np.float32)
+
+
+def _compact_volume(values):
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    return np.clip(values, 0, None).astype(np.uint64)
+
+
+def rolling_mean(values, window: int):
+    """
+    Trailing moving average in O(n) via cumulative sums. Like pandas'
+    rolling(window).mean(): NaN until `window` values, and NaN for any
+    window containing a missing value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if window <= 0 or window > len(values):
+        return out
+    finite = np.isfinite(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(finite, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(finite)))
+    window_sums = sums[window:] - sums[:-window]
+    full = (counts[window:] - counts[:-window]) == window
+    out[window - 1:] = np.where(full, window_sums / window, np.nan)
+    return out
@@ -0,0 +1,69 @@
+"""
+Price/volume indicators for the Wall Street 101 application.
+Pure NumPy computations over PriceHistory bars, cheap enough to redo on
+every chart range change for decades of daily data.
+"""
+
+from utils.performance import lazy_import
+
+np = lazy_import('numpy')
+
+# Volume-profile bin count bounds (the Rice rule is clamped into this range)
+PROFILE_MIN_BINS = 10
+PROFILE_MAX_BINS = 60
+
+
+class VolumeProfile:
+    """Traded volume per price bin: `volumes[i]` traded between `edges[i]` and `edges[i + 1]`."""
+
+    def __init__(self, edges, volumes):
+        self.edges = edges      # float64, shape (bins + 1,)
+        self.volumes = volumes  # float64, shape (bins,)
+
+    @property
+    def empty(self) -> bool:
+        return not len(self.volumes) or not self.volumes.any()
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    @property
+    def bin_width(self) -> float:
+        return float(self.edges[1] - self.edges[0]) if len(self.edges) > 1 else 0.0
+
+    @property
+    def point_of_control(self) -> float:
+        """Center of the bin with the most volume."""
+        return float(self.centers[np.argmax(self.volumes)])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.edges.nbytes + self.volumes.nbytes)
+
+
+def profile_bins(n_bars: int) -> int:
+    """Rice rule (2 * n^(1/3)): about 12 bins for a year of daily bars, 40 for thirty years."""
+    return int(np.clip(round(2 * n_bars ** (1 / 3)), PROFILE_MIN_BINS, PROFILE_MAX_BINS))
+
+
+def volume_profile(history, bins: int = None) -> VolumeProfile:
+    """
+    Volume-by-price over `history`: each bar's volume is assigned to the bin
+    holding its typical price (high + low + close) / 3, then summed with one
+    weighted `np.bincount`. Bars without a finite price are skipped.
+    """
+    typical = (history['High'].astype(np.float64) + history['Low'] + history['Close']) / 3
+    volume = history['Volume'].astype(np.float64)
+    valid = np.isfinite(typical)
+    typical, volume = typical[valid], volume[valid]
+    if not len(typical):
+        return VolumeProfile(np.zeros(1), np.zeros(0))
+
+    bins = bins or profile_bins(len(typical))
+    low, high = float(typical.min()), float(typical.max())
+    if high <= low:
+        high = low + 1e-9
+    edges = np.linspace(low, high, bins + 1)
+    index = np.minimum(((typical - low) * (bins / (high - low))).astype(np.intp), bins - 1)
+    return VolumeProfile(edges, np.bincount(index, weights=volume, minlength=bins))
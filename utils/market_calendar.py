@@ -0,0 +1,198 @@
+"""
+Exchange trading calendars for the Wall Street 101 application.
+NYSE sessions (regular hours, holidays and early closes) are computed
+locally from the exchange's published rules, so cache TTLs never depend on
+a network call. Crypto (`-USD`) symbols trade around the clock.
+"""
+
+import datetime
+from zoneinfo import ZoneInfo
+
+from config.constants import MARKET_CALENDAR_CONFIG
+
+UTC = datetime.timezone.utc
+
+# Unscheduled full-day closures that no rule can predict.
+NYSE_SPECIAL_CLOSURES = frozenset(datetime.date.fromisoformat(d) for d in (
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",  # September 11
+    "2004-06-11",                                            # President Reagan
+    "2007-01-02",                                            # President Ford
+    "2012-10-29", "2012-10-30",                              # Hurricane Sandy
+    "2018-12-05",                                            # President G.H.W. Bush
+    "2025-01-09",                                            # President Carter
+))
+
+
+def _easter(year: int) -> datetime.date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> datetime.date:
+    """n-th `weekday` (Mon=0) of a month; n=-1 for the last one."""
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: datetime.date) -> datetime.date:
+    """Saturday holidays are observed on Friday, Sunday ones on Monday."""
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> set:
+    """Full-day NYSE holidays for a year."""
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),                 # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                 # Washington's Birthday
+        _easter(year) - datetime.timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),                # Memorial Day
+        _observed(datetime.date(year, 7, 4)),        # Independence Day
+        _nth_weekday(year, 9, 0, 1),                 # Labor Day
+        _nth_weekday(year, 11, 3, 4),                # Thanksgiving
+        _observed(datetime.date(year, 12, 25)),      # Christmas
+    }
+    # New Year's Day: a Saturday holiday is not moved back into December
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+    if year >= 2022:
+        holidays.add(_observed(datetime.date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+def nyse_early_close(day: datetime.date) -> bool:
+    """13:00 closes: July 3, the day after Thanksgiving and Christmas Eve (when they are sessions)."""
+    if (day.month, day.day) in ((7, 3), (12, 24)):
+        return True
+    return day == _nth_weekday(day.year, 11, 3, 4) + datetime.timedelta(days=1)
+
+
+class ExchangeCalendar:
+    """Regular sessions of one exchange, in its local timezone."""
+
+    def __init__(self, name: str, tz: str, open_time: datetime.time, close_time: datetime.time,
+                 holiday_rule, special_closures=frozenset(), early_close_rule=None,
+                 early_close_time: datetime.time = None):
+        self.name = name
+        self.tz = ZoneInfo(tz)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.early_close_time = early_close_time
+        self._holiday_rule = holiday_rule
+        self._special_closures = special_closures
+        self._early_close_rule = early_close_rule
+        self._holidays = {}  # year -> set of dates
+
+    def holidays(self, year: int) -> set:
+        if year not in self._holidays:
+            self._holidays[year] = self._holiday_rule(year)
+        return self._holidays[year]
+
+    def is_session(self, day: datetime.date) -> bool:
+        return (day.weekday() < 5 and day not in self.holidays(day.year)
+                and day not in self._special_closures)
+
+    def session_bounds(self, day: datetime.date):
+        """(open, close) as aware datetimes, or None if the exchange is closed that day."""
+        if not self.is_session(day):
+            return None
+        early = self._early_close_rule is not None and self._early_close_rule(day)
+        close_time = self.early_close_time if early else self.close_time
+        return (datetime.datetime.combine(day, self.open_time, self.tz),
+                datetime.datetime.combine(day, close_time, self.tz))
+
+    def _sessions_from(self, now: datetime.datetime):
+        day = now.astimezone(self.tz).date()
+        for offset in range(MARKET_CALENDAR_CONFIG['search_days']):
+            bounds = self.session_bounds(day + datetime.timedelta(days=offset))
+            if bounds is not None:
+                yield bounds
+
+    def is_open(self, now: datetime.datetime = None) -> bool:
+        now = now or datetime.datetime.now(UTC)
+        bounds = self.session_bounds(now.astimezone(self.tz).date())
+        return bounds is not None and bounds[0] <= now < bounds[1]
+
+    def next_open(self, now: datetime.datetime = None) -> datetime.datetime:
+        now = now or datetime.datetime.now(UTC)
+        return next((o for o, _ in self._sessions_from(now) if o > now), None)
+
+    def next_close(self, now: datetime.datetime = None) -> datetime.datetime:
+        now = now or datetime.datetime.now(UTC)
+        return next((c for _, c in self._sessions_from(now) if c > now), None)
+
+
+class AlwaysOpenCalendar:
+    """Around-the-clock market (crypto); daily bars roll over at midnight UTC."""
+
+    name = "24/7"
+
+    def is_open(self, now: datetime.datetime = None) -> bool:
+        return True
+
+    def next_open(self, now: datetime.datetime = None) -> datetime.datetime:
+        return now or datetime.datetime.now(UTC)
+
+    def next_close(self, now: datetime.datetime = None) -> datetime.datetime:
+        now = (now or datetime.datetime.now(UTC)).astimezone(UTC)
+        return datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time(), UTC)
+
+
+NYSE = ExchangeCalendar(
+    "NYSE", "America/New_York", datetime.time(9, 30), datetime.time(16, 0),
+    holiday_rule=nyse_holidays, special_closures=NYSE_SPECIAL_CLOSURES,
+    early_close_rule=nyse_early_close, early_close_time=datetime.time(13, 0)
+)
+CRYPTO = AlwaysOpenCalendar()
+
+
+def calendar_for(symbol: str):
+    """Crypto pairs quoted in USD trade 24/7; everything else follows NYSE."""
+    return CRYPTO if symbol.upper().endswith("-USD") else NYSE
+
+
+def _seconds_until(moment: datetime.datetime, now: datetime.datetime) -> float:
+    if moment is None:
+        return float(MARKET_CALENDAR_CONFIG['fallback_ttl'])
+    return max((moment - now).total_seconds(), 0.0)
+
+
+def daily_data_ttl(symbol: str, now: datetime.datetime = None) -> float:
+    """
+    Seconds daily bars stay valid: until the next session close, plus a grace
+    period for the provider to publish the final bar.
+    """
+    now = now or datetime.datetime.now(UTC)
+    grace = datetime.timedelta(seconds=MARKET_CALENDAR_CONFIG['close_grace'])
+    # Measured from `now - grace` so a fetch just after a close expires once
+    # the grace period ends instead of holding a bar-less history overnight
+    close = calendar_for(symbol).next_close(now - grace)
+    if close is None:
+        return float(MARKET_CALENDAR_CONFIG['fallback_ttl'])
+    return _seconds_until(close + grace, now)
+
+
+def quote_ttl(symbol: str, now: datetime.datetime = None) -> float:
+    """Short TTL while the market is open; otherwise valid until it reopens."""
+    now = now or datetime.datetime.now(UTC)
+    calendar = calendar_for(symbol)
+    if calendar.is_open(now):
+        return float(MARKET_CALENDAR_CONFIG['quote_ttl_open'])
+    return max(_seconds_until(calendar.next_open(now), now), float(MARKET_CALENDAR_CONFIG['quote_ttl_open']))
@@ -0,0 +1,277 @@
+"""
+Process-wide performance metrics for the Wall Street 101 application.
+Monotonic timers, histograms with p50/p95/p99 and counters, exported in the
+Prometheus text format to a file or a local HTTP endpoint.
+"""
+
+import collections
+import functools
+import os
+import threading
+import time
+from typing import Callable
+
+from config.constants import METRICS_CONFIG
+
+QUANTILES = (0.5, 0.95, 0.99)
+OVERFLOW_LABEL = "_other"
+
+METRIC_HELP = {
+    'page_render_seconds': ('summary', "Time to render a page."),
+    'provider_fetch_seconds': ('summary', "Time spent in market data provider calls."),
+    'figure_build_seconds': ('summary', "Time to build a Plotly figure."),
+    'cache_lookup_seconds': ('summary', "Time for a data cache lookup, including misses."),
+    'cache_hits_total': ('counter', "Data cache lookups served from the cache."),
+    'cache_misses_total': ('counter', "Data cache lookups that had to compute the value."),
+    'prefetch_total': ('counter', "Background prefetches by outcome."),
+    'batch_symbols_total': ('counter', "Batch analyzer symbols by outcome."),
+    'provider_handshakes_total': ('counter', "New provider connections (TCP/TLS handshakes)."),
+    'provider_connection_reuse_total': ('counter', "Provider requests served on a kept-alive connection."),
+}
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Latency distribution: exact count/sum plus a sliding window for quantiles."""
+
+    def __init__(self, window: int):
+        self._lock = threading.Lock()
+        self._samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.sum += value
+
+    def quantiles(self, qs=QUANTILES):
+        """Nearest-rank quantiles over the recent window."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return {q: 0.0 for q in qs}
+        last = len(ordered) - 1
+        return {q: ordered[min(last, int(q * len(ordered)))] for q in qs}
+
+
+class Timer:
+    """Context manager that records elapsed `perf_counter_ns` time in seconds."""
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+        self.elapsed_ns = 0
+
+    def __enter__(self):
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.elapsed_ns = time.perf_counter_ns() - self._start_ns
+        self._histogram.observe(self.elapsed_ns / 1e9)
+
+
+class MetricsRegistry:
+    """Named, labelled counters and histograms shared by all sessions."""
+
+    def __init__(self, namespace=METRICS_CONFIG['namespace'],
+                 window=METRICS_CONFIG['histogram_window'],
+                 max_series=METRICS_CONFIG['max_series_per_metric']):
+        self.namespace = namespace
+        self._window = window
+        self._max_series = max_series
+        self._lock = threading.Lock()
+        self._metrics = {}  # name -> {label tuple: Counter | Histogram}
+
+    def _series(self, name, factory, labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        series = self._metrics.get(name)
+        if series is not None and key in series:
+            return series[key]
+        with self._lock:
+            series = self._metrics.setdefault(name, {})
+            if key not in series and len(series) >= self._max_series:
+                # Free-text labels (e.g. symbols) must not grow without bound
+                key = tuple((k, OVERFLOW_LABEL) for k, _ in key)
+            if key not in series:
+                series[key] = factory()
+            return series[key]
+
+    def counter(self, name: str, **labels) -> Counter:
+        return self._series(name, Counter, labels)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        return self._series(name, lambda: Histogram(self._window), labels)
+
+    def timer(self, name: str, **labels) -> Timer:
+        """`with registry.timer("figure_build_seconds", figure="simple"): ...`"""
+        return Timer(self.histogram(name, **labels))
+
+    def timed(self, name: str, **labels) -> Callable:
+        """Decorator form of `timer`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Plain-dict view of every series, for the debug sidebar."""
+        result = {}
+        with self._lock:
+            items = [(name, dict(series)) for name, series in self._metrics.items()]
+        for name, series in items:
+            for key, metric in series.items():
+                labels = dict(key)
+                if isinstance(metric, Histogram):
+                    entry = {'count': metric.count, 'sum': metric.sum}
+                    entry.update({f"p{int(q * 100)}": v for q, v in metric.quantiles().items()})
+                else:
+                    entry = {'value': metric.value}
+                result.setdefault(name, []).append((labels, entry))
+        return result
+
+    def render_prometheus(self) -> str:
+        """Serializes all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            items = sorted((name, dict(series)) for name, series in self._metrics.items())
+        for name, series in items:
+            full_name = f"{self.namespace}_{name}"
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for key, metric in sorted(series.items()):
+                if isinstance(metric, Histogram):
+                    for q, value in metric.quantiles().items():
+                        lines.append(f"{full_name}{_format_labels(key + (('quantile', str(q)),))} {value:.9g}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {metric.sum:.9g}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {metric.count}")
+                else:
+                    lines.append(f"{full_name}{_format_labels(key)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically writes the exposition text to `path`."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+# --- Exporters ---
+
+_export_lock = threading.Lock()
+_last_export = 0.0
+_server = None
+_server_failed = False
+_exporters_started = False
+
+
+def export_metrics(force: bool = False):
+    """Writes the Prometheus text file if configured, at most once per interval."""
+    global _last_export
+    path = os.environ.get("WS101_METRICS_FILE") or METRICS_CONFIG['export_path']
+    if not path:
+        return
+    now = time.monotonic()
+    with _export_lock:
+        if not force and now - _last_export < METRICS_CONFIG['export_interval']:
+            return
+        _last_export = now
+    REGISTRY.write_prometheus(path)
+
+
+def _metrics_handler():
+    """Request handler class for /metrics (http.server is only imported when serving)."""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep scrapes out of the Streamlit log
+
+    return MetricsHandler
+
+
+def start_metrics_server():
+    """Serves /metrics on localhost if a port is configured. Safe to call repeatedly."""
+    global _server, _server_failed
+    port = os.environ.get("WS101_METRICS_PORT") or METRICS_CONFIG['http_port']
+    if not port or _server is not None or _server_failed:
+        return _server
+    with _export_lock:
+        if _server is None and not _server_failed:
+            from http.server import ThreadingHTTPServer
+            try:
+                _server = ThreadingHTTPServer(("127.0.0.1", int(port)), _metrics_handler())
+            except OSError:
+                # Another app instance on this box already owns the port
+                _server_failed = True
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
+
+
+def _export_loop():
+    while True:
+        time.sleep(METRICS_CONFIG['export_interval'])
+        try:
+            export_metrics(force=True)
+        except OSError:
+            pass  # e.g. the export directory went away; retry next interval
+
+
+def start_metrics_exporters():
+    """
+    Starts the configured exporters once per process: the /metrics endpoint
+    and a background thread rewriting the text file every export_interval.
+    Later calls return immediately, so reruns pay nothing.
+    """
+    global _exporters_started
+    if _exporters_started:
+        return
+    with _export_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    start_metrics_server()
+    if os.environ.get("WS101_METRICS_FILE") or METRICS_CONFIG['export_path']:
+        threading.Thread(target=_export_loop, name="metrics-export", daemon=True).start()
@@ -0,0 +1,82 @@
+"""
+Candlestick pattern detection for the Wall Street 101 application.
+Each pattern is a boolean NumPy mask over a PriceHistory's OHLC arrays,
+built from whole-array comparisons against shifted copies of the bars (no
+per-bar Python loop), so 10k+ bars take a few milliseconds.
+"""
+
+from utils.performance import lazy_import
+
+np = lazy_import('numpy')
+
+# key -> (label, direction); bullish marks go below the bar, the rest above it
+PATTERNS = {
+    'doji': ('Doji', 'neutral'),
+    'hammer': ('Hammer', 'bullish'),
+    'bullish_engulfing': ('Bullish Engulfing', 'bullish'),
+    'bearish_engulfing': ('Bearish Engulfing', 'bearish'),
+    'morning_star': ('Morning Star', 'bullish'),
+    'evening_star': ('Evening Star', 'bearish'),
+    'inside_bar': ('Inside Bar', 'neutral')
+}
+
+DOJI_BODY_RATIO = 0.1       # body at most 10% of the bar's range
+HAMMER_SHADOW_RATIO = 2.0   # lower shadow at least twice the body
+STAR_BODY_RATIO = 0.3       # middle star body at most 30% of the first bar's body
+TREND_BARS = 3              # hammer: close below the close this many bars earlier
+
+
+def _shift(values, k: int):
+    """`values` delayed by k bars (NaN for the first k), so x[i] lines up with the bar i - k."""
+    shifted = np.empty_like(values)
+    shifted[:k] = np.nan
+    shifted[k:] = values[:-k]
+    return shifted
+
+
+def detect_patterns(history) -> dict:
+    """
+    Returns {pattern key: boolean mask} (see PATTERNS) for a PriceHistory
+    with Open/High/Low/Close. A mask is True on the bar completing the
+    pattern. Comparisons with the NaN padding of shifted bars are False, so
+    multi-bar patterns never fire before enough bars exist.
+    """
+    o, h, l, c = (history[col].astype(np.float64) for col in ('Open', 'High', 'Low', 'Close'))
+    body = np.abs(c - o)
+    bar_range = h - l
+    upper_shadow = h - np.maximum(o, c)
+    lower_shadow = np.minimum(o, c) - l
+    bullish = c > o
+    bearish = c < o
+
+    o1, c1, h1, l1, body1 = (_shift(x, 1) for x in (o, c, h, l, body))
+    o2, c2, body2 = (_shift(x, 2) for x in (o, c, body))
+    bullish1, bearish1 = c1 > o1, c1 < o1
+    bullish2, bearish2 = c2 > o2, c2 < o2
+
+    with np.errstate(invalid='ignore'):
+        doji = (bar_range > 0) & (body <= DOJI_BODY_RATIO * bar_range)
+        hammer = (
+            (body > 0)
+            & (lower_shadow >= HAMMER_SHADOW_RATIO * body)
+            & (upper_shadow <= body)
+            & (c1 < _shift(c, TREND_BARS + 1))  # after a decline
+        )
+        bullish_engulfing = bearish1 & bullish & (o <= c1) & (c >= o1) & (body > body1)
+        bearish_engulfing = bullish1 & bearish & (o >= c1) & (c <= o1) & (body > body1)
+
+        small_middle = body1 <= STAR_BODY_RATIO * body2
+        morning_star = bearish2 & small_middle & ((o1 + c1) / 2 < c2) & bullish & (c > (o2 + c2) / 2)
+        evening_star = bullish2 & small_middle & ((o1 + c1) / 2 > c2) & bearish & (c < (o2 + c2) / 2)
+
+        inside_bar = (h < h1) & (l > l1)
+
+    return {
+        'doji': doji,
+        'hammer': hammer,
+        'bullish_engulfing': bullish_engulfing,
+        'bearish_engulfing': bearish_engulfing,
+        'morning_star': morning_star,
+        'evening_star': evening_star,
+        'inside_bar': inside_bar
+    }
@@ -4,76 +4,507 @@ Includes lazy loading, improved caching, and memory management.
 """
 
 import streamlit as st
+import datetime
 import functools
+import hashlib
+import importlib
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
 from typing import Callable, Any
-import gc
 import time
 
+from config.constants import CACHE_CONFIG
+from utils.metrics import REGISTRY
+
+
+class LazyModule:
+    """Module proxy that performs the real import on first attribute access."""
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, attr):
+        # Only called for attributes not found on the proxy itself
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._module_name}' ({state})>"
+
 
 def lazy_import(module_name: str):
-    """Lazy import decorator to defer module loading until needed."""
-    def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            if module_name not in globals():
-                globals()[module_name] = __import__(module_name)
-            return func(*args, **kwargs)
-        return wrapper
-    return decorator
+    """
+    Defer loading a module until one of its attributes is used.
+    Returns the module itself if something else already imported it.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    return LazyModule(module_name)
+
+
+class PageRegistry:
+    """
+    Registry of page name -> "package.module:function" paths.
+    Each page module (and whatever it imports) is loaded on first navigation.
+    """
+
+    def __init__(self, pages: dict):
+        self._paths = dict(pages)
+        self._loaded = {}
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __contains__(self, page_name):
+        return page_name in self._paths
+
+    def keys(self):
+        return self._paths.keys()
+
+    def __getitem__(self, page_name: str) -> Callable:
+        page_func = self._loaded.get(page_name)
+        if page_func is None:
+            module_path, func_name = self._paths[page_name].split(":")
+            page_func = getattr(importlib.import_module(module_path), func_name)
+            self._loaded[page_name] = page_func
+        return page_func
+
+    def loaded_pages(self):
+        """Names of the pages whose modules have been imported."""
+        return list(self._loaded)
 
 
-def memory_efficient_cache(ttl: int = 600, max_entries: int = 10):
+def _hash_into(h, obj):
+    """Feeds a structural, type-tagged encoding of `obj` into hash `h`."""
+    if obj is None or isinstance(obj, (bool, int, float, complex)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, str):
+        h.update(b"str:%d:" % len(obj))
+        h.update(obj.encode("utf-8", "surrogatepass"))
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        h.update(b"bytes:%d:" % len(obj))
+        h.update(bytes(obj))
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"%s:%d[" % (type(obj).__name__.encode(), len(obj)))
+        for item in obj:
+            _hash_into(h, item)
+        h.update(b"]")
+    elif isinstance(obj, dict):
+        h.update(b"dict:%d{" % len(obj))
+        for k in sorted(obj, key=repr):
+            _hash_into(h, k)
+            _hash_into(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (set, frozenset)):
+        h.update(b"set:%d{" % len(obj))
+        for item in sorted(obj, key=repr):
+            _hash_into(h, item)
+        h.update(b"}")
+    elif _is_instance(obj, "numpy", "ndarray"):
+        h.update(f"ndarray:{obj.dtype.str}:{obj.shape};".encode())
+        h.update(repr(obj.tolist()).encode() if obj.dtype.hasobject else obj.tobytes())
+    elif _is_instance(obj, "pandas", "DataFrame") or _is_instance(obj, "pandas", "Series"):
+        pd = sys.modules["pandas"]
+        is_frame = isinstance(obj, pd.DataFrame)
+        h.update(f"{type(obj).__name__}:{obj.shape};".encode())
+        _hash_into(h, [str(c) for c in obj.columns] if is_frame else [str(obj.name)])
+        _hash_into(h, [str(t) for t in obj.dtypes] if is_frame else [str(obj.dtype)])
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        except TypeError:  # unhashable cells (lists, dicts)
+            h.update(repr(obj.to_dict()).encode())
+    elif isinstance(obj, (datetime.date, datetime.time, datetime.timedelta)):
+        h.update(f"{type(obj).__name__}:{obj.isoformat() if hasattr(obj, 'isoformat') else obj};".encode())
+    else:
+        h.update(f"{type(obj).__module__}.{type(obj).__qualname__}:{obj!r};".encode())
+
+
+def _is_instance(obj, module_name, class_name):
+    """
+    isinstance() check by class name along the MRO. It never touches
+    sys.modules, so a module still being imported by another thread (e.g. a
+    prefetch) cannot break it.
+    """
+    return any(
+        cls.__qualname__ == class_name and cls.__module__.partition('.')[0] == module_name
+        for cls in type(obj).__mro__
+    )
+
+
+def make_cache_key(args: tuple, kwargs: dict) -> bytes:
+    """Hashes call arguments structurally (DataFrames by content, not repr)."""
+    h = hashlib.blake2b(digest_size=16)
+    _hash_into(h, args)
+    _hash_into(h, kwargs)
+    return h.digest()
+
+
+def estimate_nbytes(obj, _depth: int = 0) -> int:
+    """Approximate resident size of a cached value in bytes."""
+    if _is_instance(obj, "pandas", "DataFrame"):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if _is_instance(obj, "pandas", "Series"):
+        return int(obj.memory_usage(deep=True, index=True))
+    if _is_instance(obj, "numpy", "ndarray"):
+        return int(obj.nbytes)
+    nbytes_attr = getattr(obj, "nbytes", None)
+    if isinstance(nbytes_attr, int):
+        return nbytes_attr
+    size = sys.getsizeof(obj)
+    if _depth < 3:
+        if isinstance(obj, dict):
+            size += sum(estimate_nbytes(k, _depth + 1) + estimate_nbytes(v, _depth + 1) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            size += sum(estimate_nbytes(item, _depth + 1) for item in obj)
+    return size
+
+
+class _Entry:
+    __slots__ = ('expires_at', 'nbytes', 'value', 'cost', 'priority', 'tag')
+
+    def __init__(self, expires_at, nbytes, value, cost, priority, tag):
+        self.expires_at = expires_at
+        self.nbytes = nbytes
+        self.value = value
+        self.cost = cost
+        self.priority = priority
+        self.tag = tag
+
+
+class LRUCache:
+    """
+    Thread-safe LRU with TTL, entry-count and byte budgets.
+    Recency lives in an OrderedDict, so hits and evictions are O(1).
+    `ttl` is either seconds or a policy `(key, value) -> seconds` evaluated
+    when an entry is stored (e.g. the market-calendar TTLs). With an
+    `admission` policy (utils.admission.TinyLFUAdmission), which sees every
+    lookup, new keys are always stored in a small window of recent entries;
+    an entry leaving the window only displaces the LRU victim of a full cache
+    if the policy admits it.
+    Caches register with CACHE_MANAGER, which enforces the global budget.
+    """
+
+    def __init__(self, name: str, max_entries: int = None, max_bytes: int = None, ttl=None,
+                 manager: "CacheManager" = None, admission=None):
+        self.name = name
+        self.admission = admission
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> _Entry, least recently used first
+        self._window = OrderedDict()   # keys in the admission window, least recently used first
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+        self._manager = manager if manager is not None else CACHE_MANAGER
+        self._manager.register(self)
+
+    def get(self, key):
+        """Returns (found, value) and refreshes the entry's recency."""
+        if self.admission is not None:
+            self.admission.record(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                if key in self._window:
+                    self._window.move_to_end(key)
+                entry.priority = self._manager.priority(entry.cost, entry.nbytes)
+                self.hits += 1
+        REGISTRY.counter('cache_hits_total' if entry is not None else 'cache_misses_total', cache=self.name).inc()
+        return (True, entry.value) if entry is not None else (False, None)
+
+    def put(self, key, value, nbytes: int = None, cost: float = 0.0, tag: str = None):
+        """
+        Stores a value, evicting least-recently-used entries to fit this
+        cache's budgets, then lets the manager enforce the global budget.
+        `cost` is the seconds it took to compute; `tag` groups usage (e.g. symbol).
+        """
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            in_main = key in self._entries and key not in self._window
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                self.rejections += 1  # would evict everything and still not fit
+                return False
+            priority = self._manager.priority(cost, nbytes)
+            self._entries[key] = _Entry(self._expiry(key, value), nbytes, value, cost, priority, tag)
+            self.current_bytes += nbytes
+            if self.admission is not None and self.max_entries is not None and not in_main:
+                self._window[key] = None
+                if len(self._window) > self.admission.window_size:
+                    self._leave_window()
+            while self._over_budget():
+                # Recent entries in the window go last
+                victim = self._lru_victim(main_only=True)
+                self._remove(victim if victim is not None else self._lru_victim())
+                self.evictions += 1
+        self._manager.enforce_budget()
+        return True
+
+    def _leave_window(self):
+        """Moves the window's LRU entry to the main cache if it beats the main LRU victim there."""
+        candidate, _ = self._window.popitem(last=False)
+        if len(self._entries) <= self.max_entries:
+            return
+        victim = self._lru_victim(main_only=True)
+        if victim is None:
+            return
+        if self.admission.admit(candidate, victim):
+            self._remove(victim)
+            self.evictions += 1
+        else:
+            self._remove(candidate)
+            self.rejections += 1  # seen less often than what it would evict
+
+    def _expiry(self, key, value):
+        if self.ttl is None:
+            return None
+        ttl = self.ttl(key, value) if callable(self.ttl) else self.ttl
+        return time.monotonic() + ttl
+
+    def _lru_victim(self, main_only: bool = False):
+        """
+        Least recently used key, skipping pinned ones unless everything is
+        pinned. `main_only` also skips the admission window (and then never
+        falls back to a pinned key).
+        """
+        if self.admission is not None:
+            for key in self._entries:
+                if not self.admission.is_pinned(key) and not (main_only and key in self._window):
+                    return key
+            if main_only:
+                return None
+        return next(iter(self._entries), None)
+
+    def _over_budget(self):
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.current_bytes > self.max_bytes
+
+    def _remove(self, key):
+        self._window.pop(key, None)
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.nbytes
+        return entry
+
+    def eviction_candidate(self, sample: int):
+        """Lowest-priority entry among the `sample` least recently used ones."""
+        with self._lock:
+            best = None
+            for i, (key, entry) in enumerate(self._entries.items()):
+                if i >= sample:
+                    break
+                if self.admission is not None and self.admission.is_pinned(key):
+                    continue
+                if best is None or entry.priority < best[1].priority:
+                    best = (key, entry)
+            return best
+
+    def evict(self, key):
+        """Evicts one entry on behalf of the manager; returns it (or None if gone)."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self.evictions += 1
+            return self._remove(key)
+
+    def usage_by_tag(self) -> dict:
+        with self._lock:
+            usage = {}
+            for entry in self._entries.values():
+                usage[entry.tag] = usage.get(entry.tag, 0) + entry.nbytes
+            return usage
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._window.clear()
+            self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def info(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'rejections': self.rejections,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_size': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': getattr(self.ttl, '__name__', 'policy') if callable(self.ttl) else self.ttl
+            }
+
+
+class CacheManager:
+    """
+    Enforces one byte budget across every registered cache plus the
+    per-session state sizes reported by the app.
+
+    Eviction is cost-aware (GreedyDual-Size): an entry's priority is the
+    manager's clock plus recompute-seconds per byte, refreshed on each hit.
+    The victim is the lowest-priority entry among each cache's least
+    recently used few, and the clock advances to its priority, so entries
+    that are cheap to refetch or very large go first while idle entries
+    age out.
+    """
+
+    def __init__(self, max_bytes: int = None, sample: int = CACHE_CONFIG['eviction_sample']):
+        if max_bytes is None:
+            budget_mb = os.environ.get("WS101_CACHE_BUDGET_MB")
+            max_bytes = int(float(budget_mb) * 1024 * 1024) if budget_mb else CACHE_CONFIG['global_max_bytes']
+        self.max_bytes = max_bytes
+        self.sample = sample
+        self.clock = 0.0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._caches = weakref.WeakValueDictionary()
+        self._sessions = {}  # session id -> (reported_at, nbytes)
+
+    def register(self, cache: LRUCache):
+        with self._lock:
+            self._caches[id(cache)] = cache
+
+    def caches(self):
+        with self._lock:
+            return list(self._caches.values())
+
+    def clear(self):
+        """Empties every registered cache (e.g. between benchmark samples)."""
+        for cache in self.caches():
+            cache.clear()
+
+    def priority(self, cost: float, nbytes: int) -> float:
+        # Per-MiB scaling keeps priorities in a readable range
+        return self.clock + cost / max(nbytes / (1024 * 1024), 1e-6)
+
+    def report_session(self, session_id: str, nbytes: int):
+        """Records the size of one session's state; counts against the budget."""
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (now, nbytes)
+            stale = [sid for sid, (seen, _) in self._sessions.items()
+                     if now - seen > CACHE_CONFIG['session_ttl']]
+            for sid in stale:
+                del self._sessions[sid]
+        self.enforce_budget()
+
+    def session_bytes(self) -> int:
+        with self._lock:
+            return sum(nbytes for _, nbytes in self._sessions.values())
+
+    def total_bytes(self) -> int:
+        return sum(cache.current_bytes for cache in self.caches()) + self.session_bytes()
+
+    def enforce_budget(self):
+        """Evicts across caches until caches + sessions fit the global budget."""
+        with self._lock:
+            while self.total_bytes() > self.max_bytes:
+                candidates = [
+                    (cache, candidate)
+                    for cache in self.caches()
+                    for candidate in [cache.eviction_candidate(self.sample)]
+                    if candidate is not None
+                ]
+                if not candidates:
+                    return  # only session state left; nothing we can evict
+                cache, (key, entry) = min(candidates, key=lambda c: c[1][1].priority)
+                if cache.evict(key) is not None:
+                    self.clock = max(self.clock, entry.priority)
+                    self.evictions += 1
+
+    def usage_report(self) -> dict:
+        """Current usage by cache and by tag (symbol), for the debug view."""
+        caches = {}
+        by_tag = {}
+        for cache in self.caches():
+            caches[cache.name] = {'bytes': cache.current_bytes, 'entries': len(cache)}
+            for tag, nbytes in cache.usage_by_tag().items():
+                if tag is not None:
+                    by_tag[tag] = by_tag.get(tag, 0) + nbytes
+        return {
+            'budget_bytes': self.max_bytes,
+            'total_bytes': self.total_bytes(),
+            'session_bytes': self.session_bytes(),
+            'sessions': len(self._sessions),
+            'evictions': self.evictions,
+            'caches': caches,
+            'by_tag': dict(sorted(by_tag.items(), key=lambda kv: kv[1], reverse=True))
+        }
+
+
+CACHE_MANAGER = CacheManager()
+
+
+def memory_efficient_cache(ttl: int = 600, max_entries: int = 10, max_bytes: int = None, name: str = None,
+                           tag: Callable = None):
     """
     Memory-efficient caching decorator with LRU eviction.
-    Automatically cleans up old entries to prevent memory bloat.
+    Keys are structural hashes of the arguments; entries are bounded by count
+    and (optionally) by their measured size in bytes, and count against the
+    global budget. `tag(*args, **kwargs)` labels entries for usage reports.
     """
     def decorator(func: Callable) -> Callable:
-        cache = {}
-        access_times = {}
+        cache = LRUCache(name or func.__qualname__, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
         
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Create cache key
-            key = str(args) + str(sorted(kwargs.items()))
-            current_time = time.time()
-            
-            # Check if cached result exists and is still valid
-            if key in cache:
-                cached_time, result = cache[key]
-                if current_time - cached_time < ttl:
-                    access_times[key] = current_time
-                    return result
-                else:
-                    # Remove expired entry
-                    del cache[key]
-                    del access_times[key]
-            
-            # Evict oldest entries if cache is full
-            if len(cache) >= max_entries:
-                oldest_key = min(access_times.keys(), key=access_times.get)
-                del cache[oldest_key]
-                del access_times[oldest_key]
-                # Trigger garbage collection
-                gc.collect()
-            
-            # Compute and cache result
+            key = make_cache_key(args, kwargs)
+            found, result = cache.get(key)
+            if found:
+                return result
+            # Computed outside the lock so slow calls don't block other sessions
+            start = time.perf_counter()
             result = func(*args, **kwargs)
-            cache[key] = (current_time, result)
-            access_times[key] = current_time
-            
+            cost = time.perf_counter() - start
+            cache.put(key, result, cost=cost, tag=tag(*args, **kwargs) if tag else None)
             return result
         
-        wrapper.cache_info = lambda: {
-            'hits': len(cache),
-            'max_size': max_entries,
-            'ttl': ttl
-        }
-        wrapper.cache_clear = lambda: (cache.clear(), access_times.clear())
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
         
         return wrapper
     return decorator
 
 
+def fragment(func: Callable) -> Callable:
+    """
+    Run `func` as a Streamlit fragment so widget interactions inside it rerun
+    only that function, not the whole script. Falls back to a plain call on
+    Streamlit versions without fragments.
+    """
+    decorator = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    return decorator(func) if decorator else func
+
+
 class ComponentLoader:
     """Lazy component loader to improve initial app load time."""
     
@@ -96,13 +527,18 @@ class ComponentLoader:
 
 
 def optimize_dataframe(df):
-    """Optimize pandas DataFrame memory usage."""
+    """
+    Optimize pandas DataFrame memory usage without changing values.
+    Cached price histories use utils.history.PriceHistory instead.
+    """
     if df.empty:
         return df
     
-    # Optimize numeric columns
+    # Downcast floats only where float32 represents every value exactly
     for col in df.select_dtypes(include=['float64']).columns:
-        df[col] = df[col].astype('float32')
+        as_float32 = df[col].astype('float32')
+        if as_float32.astype('float64').equals(df[col]):
+            df[col] = as_float32
     
     for col in df.select_dtypes(include=['int64']).columns:
         if df[col].min() >= 0:
@@ -110,14 +546,16 @@ def optimize_dataframe(df):
                 df[col] = df[col].astype('uint8')
             elif df[col].max() < 65535:
                 df[col] = df[col].astype('uint16')
-            else:
+            elif df[col].max() < 2 ** 32:
                 df[col] = df[col].astype('uint32')
+            else:
+                df[col] = df[col].astype('uint64')
         else:
             if df[col].min() > -128 and df[col].max() < 127:
                 df[col] = df[col].astype('int8')
             elif df[col].min() > -32768 and df[col].max() < 32767:
                 df[col] = df[col].astype('int16')
-            else:
+            elif df[col].min() >= -2 ** 31 and df[col].max() < 2 ** 31:
                 df[col] = df[col].astype('int32')
     
     return df
@@ -130,21 +568,28 @@ def batch_process(items, batch_size: int = 100):
 
 
 class PerformanceMonitor:
-    """Simple performance monitoring for development."""
+    """
+    Times a block with a monotonic clock. Records the duration in the metrics
+    registry when `metric` is given, and shows it in the sidebar in debug mode.
+    """
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, metric: str = None, **labels):
         self.name = name
-        self.start_time = None
+        self.metric = metric
+        self.labels = labels
+        self.start_ns = None
+        self.duration_ns = None
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_ns = time.perf_counter_ns()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        end_time = time.time()
-        duration = end_time - self.start_time
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        if self.metric:
+            REGISTRY.histogram(self.metric, **self.labels).observe(self.duration_ns / 1e9)
         if st.session_state.get('debug_mode', False):
-            st.sidebar.text(f"{self.name}: {duration:.3f}s")
+            st.sidebar.text(f"{self.name}: {self.duration_ns / 1e9:.3f}s")
 
 
 # Streamlit-specific optimizations
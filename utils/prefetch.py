@@ -0,0 +1,79 @@
+"""
+Speculative background prefetching for the Wall Street 101 application.
+Pages hint at what the student is likely to open next (the next learning
+card, the fun-fact symbol) and a small worker pool warms the data and
+figure caches while the current view is being read.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from config.constants import PREFETCH_CONFIG
+from utils.metrics import REGISTRY
+
+
+class Prefetcher:
+    """
+    Process-wide pool of background workers. Work is keyed so the same
+    prefetch is only in flight once; foreground code can `wait` on a key to
+    reuse an in-flight prefetch instead of fetching the same data twice.
+    Workers never touch Streamlit APIs, only the shared caches.
+    """
+
+    def __init__(self, workers: int = PREFETCH_CONFIG['workers'], enabled: bool = PREFETCH_CONFIG['enabled']):
+        self.workers = workers
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> Future
+        self._executor = None
+
+    def submit(self, key, func, *args, **kwargs) -> bool:
+        """Schedules func(*args, **kwargs) unless the same key is already in flight."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            if key in self._pending:
+                REGISTRY.counter('prefetch_total', outcome='deduplicated').inc()
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+            future = self._executor.submit(func, *args, **kwargs)
+            self._pending[key] = future
+        REGISTRY.counter('prefetch_total', outcome='submitted').inc()
+        future.add_done_callback(lambda f, key=key: self._done(key, f))
+        return True
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        REGISTRY.counter('prefetch_total', outcome='failed' if future.exception() else 'completed').inc()
+
+    def wait(self, key, timeout: float = PREFETCH_CONFIG['wait_timeout']) -> bool:
+        """Blocks until an in-flight prefetch for `key` finishes; False if none was running."""
+        with self._lock:
+            future = self._pending.get(key)
+        if future is None:
+            return False
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        except Exception:
+            pass  # the foreground path retries and surfaces the error itself
+        REGISTRY.counter('prefetch_total', outcome='awaited').inc()
+        return True
+
+    def wait_all(self, timeout: float = PREFETCH_CONFIG['wait_timeout']):
+        """Blocks until every prefetch in flight now has finished."""
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self.wait(key, timeout)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+PREFETCHER = Prefetcher()
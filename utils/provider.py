@@ -0,0 +1,139 @@
+"""
+Shared market data provider session for the Wall Street 101 application.
+Every yfinance call goes through one process-wide HTTP session with
+keep-alive, timeouts and retries, so TLS handshakes and Yahoo's
+cookie/crumb negotiation are paid once rather than on every call.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.constants import PROVIDER_CONFIG
+from utils.metrics import REGISTRY
+from utils.performance import lazy_import
+
+yf = lazy_import('yfinance')
+
+
+class ProviderSession:
+    """
+    Lazily built, thread-safe pooled session.
+
+    With curl_cffi (what yfinance uses by default) each thread owns its own
+    curl handle and connection cache. Streamlit starts a new thread for every
+    rerun, so provider calls run on a fixed pool of `pool_size` worker
+    threads instead: their handles, and the connections they keep alive,
+    outlive any single rerun. With the plain requests backend the session's
+    urllib3 pool is shared by all threads and sized the same way.
+    """
+
+    def __init__(self, config: dict = PROVIDER_CONFIG):
+        self.config = config
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor = None
+        self._pool_counts = (0, 0)  # requests backend: (connections, requests) seen so far
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self):
+        try:
+            from curl_cffi import requests as curl_requests
+            from curl_cffi.const import CurlInfo
+        except ImportError:
+            return self._build_requests_session()
+
+        config = self.config
+        observe = self._observe_connects
+
+        class MeteredSession(curl_requests.Session):
+            def request(self, *args, **kwargs):
+                response = super().request(*args, **kwargs)
+                observe(response.infos.get(CurlInfo.NUM_CONNECTS, 0))
+                return response
+
+        return MeteredSession(
+            impersonate=config['impersonate'],
+            timeout=(config['connect_timeout'], config['read_timeout']),
+            retry=curl_requests.RetryStrategy(
+                count=config['retries'], delay=config['retry_backoff'], backoff="exponential"
+            ),
+            curl_infos=[CurlInfo.NUM_CONNECTS]
+        )
+
+    def _build_requests_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        config = self.config
+        adapter = HTTPAdapter(
+            pool_connections=config['pool_size'],
+            pool_maxsize=config['pool_size'],
+            max_retries=Retry(
+                total=config['retries'], backoff_factor=config['retry_backoff'],
+                status_forcelist=(429, 500, 502, 503, 504)
+            )
+        )
+        timeout = (config['connect_timeout'], config['read_timeout'])
+        observe = self._observe_pools
+
+        class MeteredSession(requests.Session):
+            def request(self, *args, **kwargs):
+                kwargs.setdefault('timeout', timeout)
+                response = super().request(*args, **kwargs)
+                observe(adapter)
+                return response
+
+        session = MeteredSession()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _observe_connects(self, new_connections: int):
+        """curl backend: NUM_CONNECTS is 0 when the request reused a kept-alive connection."""
+        if new_connections:
+            REGISTRY.counter('provider_handshakes_total').inc(new_connections)
+        else:
+            REGISTRY.counter('provider_connection_reuse_total').inc()
+
+    def _observe_pools(self, adapter):
+        """requests backend: derive handshakes and reuses from urllib3 pool counters."""
+        pools = list(adapter.poolmanager.pools._container.values())
+        connections = sum(pool.num_connections for pool in pools)
+        requests_made = sum(pool.num_requests for pool in pools)
+        with self._lock:
+            new_connections = max(connections - self._pool_counts[0], 0)
+            new_requests = max(requests_made - self._pool_counts[1], 0)
+            self._pool_counts = (connections, requests_made)
+        if new_connections:
+            REGISTRY.counter('provider_handshakes_total').inc(new_connections)
+        if new_requests > new_connections:
+            REGISTRY.counter('provider_connection_reuse_total').inc(new_requests - new_connections)
+
+    def call(self, func, *args, **kwargs):
+        """Runs a provider call on the pool's long-lived worker threads."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config['pool_size'], thread_name_prefix="provider"
+                    )
+        return self._executor.submit(func, *args, **kwargs).result()
+
+    def ticker(self, symbol: str):
+        """yf.Ticker bound to the shared session. Call its lazy properties through `call`."""
+        return yf.Ticker(symbol, session=self.session)
+
+    def download(self, *args, **kwargs):
+        kwargs.setdefault('session', self.session)
+        return self.call(yf.download, *args, **kwargs)
+
+
+PROVIDER = ProviderSession()
@@ -0,0 +1,80 @@
+"""
+Drawdown (underwater) analytics for the Wall Street 101 application.
+Everything is derived from one running maximum (`np.maximum.accumulate`)
+over a value series, so any page that reports risk can reuse it on the
+cached histories without a per-bar Python loop.
+"""
+
+import datetime
+
+from utils.performance import lazy_import
+
+np = lazy_import('numpy')
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _date(day) -> datetime.date:
+    return _EPOCH + datetime.timedelta(days=int(day))
+
+
+def underwater(values):
+    """Fractional distance below the running high (0 at a new high, -0.9 for a 90% loss)."""
+    values = np.asarray(values, dtype=np.float64)
+    return values / np.maximum.accumulate(values, axis=0) - 1.0
+
+
+def max_drawdown(values):
+    """Largest peak-to-trough loss as a negative fraction; per column for 2-D input."""
+    return underwater(values).min(axis=0)
+
+
+class Drawdown:
+    """
+    Drawdown profile of a value series over trading days (int64 epoch days):
+    the underwater curve, the worst peak → trough → recovery episode, and the
+    longest time spent below a previous high.
+    """
+
+    def __init__(self, days, values):
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.all():
+            days, values = days[finite], values[finite]
+        self.days = days
+        self.underwater = underwater(values)
+
+        trough = int(np.argmin(self.underwater))
+        at_high = self.underwater >= 0
+        peak = int(np.flatnonzero(at_high[:trough + 1])[-1])
+        recovered = np.flatnonzero(at_high[trough:])
+
+        self.max_drawdown = float(self.underwater[trough])
+        self.peak_date = _date(days[peak])
+        self.trough_date = _date(days[trough])
+        self.peak_value = float(values[peak])
+        self.trough_value = float(values[trough])
+        self.recovery_date = _date(days[trough + recovered[0]]) if len(recovered) else None
+
+        # Time between consecutive highs; the last one runs to the series end
+        highs = np.flatnonzero(at_high)
+        spans = np.diff(np.append(days[highs], days[-1]))
+        longest = int(np.argmax(spans))
+        self.max_duration_days = int(spans[longest])
+        self.max_duration_start = _date(days[highs[longest]])
+        self.current_drawdown = float(self.underwater[-1])
+
+    @property
+    def recovery_days(self):
+        """Calendar days from the worst trough back to the prior high, or None if not recovered."""
+        return (self.recovery_date - self.trough_date).days if self.recovery_date else None
+
+    @property
+    def decline_days(self) -> int:
+        """Calendar days from the peak down to the worst trough."""
+        return (self.trough_date - self.peak_date).days
+
+
+def drawdown(history, column: str = 'Close') -> Drawdown:
+    """Drawdown profile of one column of a (non-empty) PriceHistory."""
+    return Drawdown(history.days, history[column])
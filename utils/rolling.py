@@ -0,0 +1,207 @@
+"""
+Rolling risk statistics for the Wall Street 101 application.
+Annualized volatility, Sharpe ratio and beta against a benchmark (SPY)
+over a trailing window of daily returns. Statistics come from prefix sums,
+so every window costs two subtractions: a full history is O(n), and when
+new bars arrive only the tail is aligned, summed and computed.
+"""
+
+import math
+import threading
+
+from config.constants import ROLLING_CONFIG
+from utils.helpers import get_full_history
+from utils.performance import LRUCache, lazy_import
+from utils.tracing import span
+
+np = lazy_import('numpy')
+
+# Rows of the prefix-sum matrix: r, r², m, m², r·m (r = symbol, m = benchmark returns)
+_R, _RR, _M, _MM, _RM = range(5)
+
+# A stored return still matches refreshed data if it differs by less than this
+RETURN_TOLERANCE = 1e-6
+
+
+def window_sums(prefix, window: int, start: int = 0):
+    """
+    Trailing-window sums ending at each value index from `start` on, given
+    prefix sums along the last axis (prefix[..., i] = sum of the first i
+    values). NaN until a window is full.
+    """
+    ends = np.arange(start, prefix.shape[-1] - 1) + 1
+    begins = ends - window
+    full = begins >= 0
+    sums = np.full(prefix.shape[:-1] + ends.shape, np.nan)
+    sums[..., full] = prefix[..., ends[full]] - prefix[..., begins[full]]
+    return sums
+
+
+def _aligned_closes(history, benchmark, since=None):
+    """(days, closes, benchmark closes) on sessions where both have a finite close, from day `since` on."""
+    parts = []
+    for h in (history, benchmark):
+        start = 0 if since is None else int(np.searchsorted(h.days, since, side='left'))
+        days, closes = h.days[start:], h['Close'][start:].astype(np.float64)
+        finite = np.isfinite(closes)
+        parts.append((days[finite], closes[finite]))
+    (days, closes), (bench_days, bench_closes) = parts
+    common, i, j = np.intersect1d(days, bench_days, assume_unique=True, return_indices=True)
+    return common, closes[i], bench_closes[j]
+
+
+class RollingStats:
+    """
+    Rolling statistics of one symbol against the benchmark, over the
+    sessions both traded (so crypto is sampled on stock-market days).
+    `volatility`, `sharpe` and `beta` are aligned with `days`, the session
+    ending each return, and are NaN until the first full window.
+    """
+
+    def __init__(self, window: int, periods_per_year: int = ROLLING_CONFIG['periods_per_year'],
+                 risk_free_rate: float = ROLLING_CONFIG['risk_free_rate']):
+        if window < 2:
+            raise ValueError(f"Rolling window must be at least 2 bars, got {window}")
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.risk_free_rate = risk_free_rate
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.sessions = np.zeros(0, dtype=np.int64)  # aligned sessions, including the first (no return)
+        self.volatility = np.zeros(0)
+        self.sharpe = np.zeros(0)
+        self.beta = np.zeros(0)
+        self._prefix = np.zeros((5, 1))
+        self._version = None
+
+    def __len__(self):
+        return len(self.volatility)
+
+    @property
+    def days(self):
+        return self.sessions[1:]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.sessions.nbytes + 3 * self.volatility.nbytes + self._prefix.nbytes)
+
+    def series(self):
+        """Consistent (days, volatility, sharpe, beta) arrays, safe to read while another thread updates."""
+        with self._lock:
+            return self.days, self.volatility, self.sharpe, self.beta
+
+    def latest(self) -> dict:
+        """The most recent value of each statistic."""
+        with self._lock:
+            if not len(self):
+                return {}
+            return {'volatility': float(self.volatility[-1]), 'sharpe': float(self.sharpe[-1]),
+                    'beta': float(self.beta[-1])}
+
+    # --- Updating ---
+
+    def extend(self, days, closes, benchmark_closes) -> int:
+        """
+        Appends aligned sessions. After the first call `days` must start at
+        the last session already seen: its closes (which may have been
+        re-adjusted since) anchor the first new return. Only the new windows
+        are computed. Returns the number of returns added.
+        """
+        if not len(days):
+            return 0
+        if len(self.sessions) and days[0] != self.sessions[-1]:
+            raise ValueError("extend() must start at the last session already seen")
+        added = days[1:] if len(self.sessions) else days
+        if len(days) < 2:
+            self.sessions = np.concatenate((self.sessions, added))
+            return 0
+
+        r = closes[1:] / closes[:-1] - 1.0
+        m = benchmark_closes[1:] / benchmark_closes[:-1] - 1.0
+        increments = np.stack((r, r * r, m, m * m, r * m))
+        start = len(self)
+        self._prefix = np.concatenate(
+            (self._prefix, self._prefix[:, -1:] + np.cumsum(increments, axis=1)), axis=1
+        )
+        volatility, sharpe, beta = self._statistics(start)
+        self.sessions = np.concatenate((self.sessions, added))
+        self.volatility = np.concatenate((self.volatility, volatility))
+        self.sharpe = np.concatenate((self.sharpe, sharpe))
+        self.beta = np.concatenate((self.beta, beta))
+        return len(r)
+
+    def _statistics(self, start: int):
+        """Volatility, Sharpe and beta for the windows ending at return indexes start..n-1."""
+        w = self.window
+        sums = window_sums(self._prefix, w, start)
+        scale = math.sqrt(self.periods_per_year)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = sums[_R] / w
+            variance = np.maximum(sums[_RR] - sums[_R] * mean, 0.0) / (w - 1)
+            benchmark_variance = np.maximum(sums[_MM] - sums[_M] * sums[_M] / w, 0.0) / (w - 1)
+            covariance = (sums[_RM] - sums[_R] * sums[_M] / w) / (w - 1)
+            std = np.sqrt(variance)
+            volatility = std * scale
+            excess = mean - self.risk_free_rate / self.periods_per_year
+            sharpe = np.where(std > 0, excess / std * scale, np.nan)
+            beta = np.where(benchmark_variance > 0, covariance / benchmark_variance, np.nan)
+        return volatility, sharpe, beta
+
+    def _last_returns(self):
+        last = self._prefix[:, -1] - self._prefix[:, -2]
+        return last[_R], last[_M]
+
+    def update(self, history, benchmark) -> int:
+        """
+        Brings the statistics up to date with refreshed Close histories.
+        Only sessions from the last one seen on are aligned and computed; if
+        the last stored return no longer matches the new data (a revision,
+        not just a constant re-adjustment), everything is rebuilt.
+        Returns the number of returns added.
+        """
+        version = (len(history), history.last_date, len(benchmark), benchmark.last_date)
+        with self._lock:
+            if version == self._version:
+                return 0
+            self._version = version
+            if len(self):
+                previous, last = self.sessions[-2], self.sessions[-1]
+                days, closes, benchmark_closes = _aligned_closes(history, benchmark, since=previous)
+                if len(days) >= 2 and days[0] == previous and days[1] == last:
+                    # Returns survive a constant re-adjustment up to float32 price rounding
+                    r, m = self._last_returns()
+                    if (math.isclose(closes[1] / closes[0] - 1, r, abs_tol=RETURN_TOLERANCE)
+                            and math.isclose(benchmark_closes[1] / benchmark_closes[0] - 1, m,
+                                             abs_tol=RETURN_TOLERANCE)):
+                        return self.extend(days[1:], closes[1:], benchmark_closes[1:])
+            self._reset()
+            self._version = version
+            return self.extend(*_aligned_closes(history, benchmark))
+
+
+# One engine per (symbol, window). No TTL: entries outlive the daily data so
+# a refresh only appends the new bars.
+ROLLING_CACHE = LRUCache('rolling_stats', max_entries=ROLLING_CONFIG['cache_entries'])
+
+
+def get_rolling_stats(symbol: str, window: int = ROLLING_CONFIG['default_window']):
+    """RollingStats for a symbol against ROLLING_CONFIG['benchmark'], or None without data."""
+    benchmark_symbol = ROLLING_CONFIG['benchmark']
+    history = get_full_history(symbol, columns=('Close',))
+    benchmark = history if symbol == benchmark_symbol else get_full_history(benchmark_symbol, columns=('Close',))
+    if history.empty or benchmark.empty:
+        return None
+
+    key = (symbol, window)
+    found, stats = ROLLING_CACHE.get(key)
+    if not found:
+        stats = RollingStats(window)
+    with span("compute.rolling_stats", symbol=symbol, window=window) as s:
+        added = stats.update(history, benchmark)
+    if s is not None:
+        s.attrs['added'] = added
+    if not found or added:
+        ROLLING_CACHE.put(key, stats, nbytes=stats.nbytes, tag=symbol)
+    return stats if len(stats) else None
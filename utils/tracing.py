@@ -0,0 +1,158 @@
+"""
+Lightweight in-process tracing for the Wall Street 101 application.
+Builds a span tree per script rerun (fetch → compute → figure build → render)
+so a slow card can be attributed to the step that was actually slow.
+"""
+
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+from config.constants import TRACING_CONFIG
+
+_current_span = contextvars.ContextVar('ws101_current_span', default=None)
+_current_root = contextvars.ContextVar('ws101_current_root', default=None)
+_dump_lock = threading.Lock()
+
+
+class Span:
+    """One timed step; children are the steps it called."""
+
+    __slots__ = ('name', 'attrs', 'start_ns', 'end_ns', 'children', 'span_count')
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.children = []
+        self.span_count = 1  # only maintained on the root
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self, origin_ns: int = None) -> dict:
+        origin_ns = self.start_ns if origin_ns is None else origin_ns
+        return {
+            'name': self.name,
+            'attrs': self.attrs,
+            'start_ms': round((self.start_ns - origin_ns) / 1e6, 3),
+            'duration_ms': round(self.duration_ms, 3),
+            'children': [child.to_dict(origin_ns) for child in self.children]
+        }
+
+
+def _close(s: Span, error: BaseException = None):
+    s.end_ns = time.perf_counter_ns()
+    if error is not None:
+        s.attrs['error'] = type(error).__name__
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """Times a step under the current span. A no-op outside of a trace."""
+    parent = _current_span.get()
+    root = _current_root.get()
+    if parent is None or root.span_count >= TRACING_CONFIG['max_spans_per_trace']:
+        yield None
+        return
+
+    s = Span(name, attrs)
+    parent.children.append(s)
+    root.span_count += 1
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        _close(s, e)
+        raise
+    else:
+        _close(s)
+    finally:
+        _current_span.reset(token)
+
+
+@contextlib.contextmanager
+def trace(name: str, **attrs):
+    """
+    Starts a root span (one per rerun or fragment run). Nested calls behave
+    like `span`. Slow traces are appended to the slow-trace JSONL file.
+    """
+    if _current_span.get() is not None:
+        with span(name, **attrs) as s:
+            yield s
+        return
+
+    root = Span(name, attrs)
+    span_token = _current_span.set(root)
+    root_token = _current_root.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        _close(root, e)
+        raise
+    else:
+        _close(root)
+    finally:
+        _current_root.reset(root_token)
+        _current_span.reset(span_token)
+        if root.duration_ms >= TRACING_CONFIG['slow_trace_ms']:
+            dump_trace(root)
+
+
+def traced(name: str = None, **attrs):
+    """Decorator form of `span`; defaults to the function's qualified name."""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attrs):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def dump_trace(root: Span, path: str = None):
+    """Appends a finished trace as one JSON line for offline analysis."""
+    if path is None:
+        path = os.environ.get("WS101_SLOW_TRACE_FILE", TRACING_CONFIG['slow_trace_path'])
+    if not path:
+        return
+    record = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'trace': root.name,
+        'duration_ms': round(root.duration_ms, 3),
+        'span_count': root.span_count,
+        'root': root.to_dict()
+    }
+    line = json.dumps(record, default=str, ensure_ascii=False)
+    with _dump_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def format_waterfall(root: Span, width: int = TRACING_CONFIG['waterfall_width']) -> str:
+    """Renders a span tree as a monospace waterfall, one line per span."""
+    total_ns = max((root.end_ns or time.perf_counter_ns()) - root.start_ns, 1)
+    lines = []
+
+    def walk(s: Span, depth: int):
+        end_ns = s.end_ns or time.perf_counter_ns()
+        offset = int((s.start_ns - root.start_ns) / total_ns * width)
+        length = max(1, int((end_ns - s.start_ns) / total_ns * width))
+        bar = (" " * offset + "█" * length).ljust(width)[:width]
+        label = ("  " * depth + s.name)[:34]
+        lines.append(f"{label:<34}|{bar}|{s.duration_ms:>8.1f}ms")
+        for child in s.children:
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
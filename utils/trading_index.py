@@ -0,0 +1,108 @@
+"""
+Persisted first/last trading-day index for the Wall Street 101 application.
+A small SQLite table of symbol -> (first trading day, last trading day,
+last updated), filled in as a side effect of history fetches so forms can
+validate dates without loading any price data.
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+from config.constants import TRADING_INDEX_CONFIG
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trading_dates (
+    symbol TEXT PRIMARY KEY,
+    first_day TEXT,
+    last_day TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class TradingDateIndex:
+    """
+    Thread-safe wrapper around one SQLite file shared by all sessions (and,
+    through WAL mode, by other app instances on the same box). Falls back to
+    an in-memory table if the file cannot be opened.
+    """
+
+    def __init__(self, path: str = None, max_age: float = TRADING_INDEX_CONFIG['max_age']):
+        if path is None:
+            path = os.environ.get("WS101_TRADING_INDEX", TRADING_INDEX_CONFIG['path'])
+        self.path = path or ":memory:"
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            try:
+                conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error:
+                conn = sqlite3.connect(":memory:", check_same_thread=False)
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, symbol: str):
+        """
+        Returns (first_day, last_day) for a symbol whose first day is known and
+        whose entry is fresh, else None. first_day is only known from a
+        max-period fetch.
+        """
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT first_day, last_day, updated_at FROM trading_dates WHERE symbol = ?",
+                    (symbol.upper(),)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or row[0] is None or time.time() - row[2] > self.max_age:
+            return None
+        return datetime.date.fromisoformat(row[0]), datetime.date.fromisoformat(row[1])
+
+    def record(self, symbol: str, first_day: datetime.date = None, last_day: datetime.date = None):
+        """
+        Upserts what a fetch learned. `first_day` is only passed for full
+        (max-period) histories; `last_day` only ever moves forward.
+        """
+        if last_day is None:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    """
+                    INSERT INTO trading_dates (symbol, first_day, last_day, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(symbol) DO UPDATE SET
+                        first_day = COALESCE(excluded.first_day, trading_dates.first_day),
+                        last_day = MAX(excluded.last_day, trading_dates.last_day),
+                        updated_at = excluded.updated_at
+                    """,
+                    (symbol.upper(), first_day.isoformat() if first_day else None,
+                     last_day.isoformat(), time.time())
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass  # the index is an optimization; never fail a fetch over it
+
+    def clear(self):
+        """Forgets every symbol (e.g. between benchmark samples)."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM trading_dates")
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+TRADING_DATES = TradingDateIndex()